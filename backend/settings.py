@@ -87,16 +87,51 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Hashed filenames let whitenoise serve static files with far-future
+    # cache headers; collectstatic also writes gzip/brotli copies
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Add Django's static URL pattern in development. Off by default because
+# whitenoise already serves static files. Media files (downloaded images)
+# aren't covered by whitenoise, so their pattern is always added under DEBUG.
+SERVE_STATIC_FROM_DJANGO = config('SERVE_STATIC_FROM_DJANGO', default=False, cast=bool)
+
+# The default cache is local to each process, so a hit costs no query. What
+# it holds (source states, image metadata) is cheap to rebuild, and the
+# source states expire within a minute in processes that didn't write them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # OpenAI description results, shared through the database. Kept apart
+    # from 'default' so they are never culled to make room for other entries,
+    # and a rerun after a failed run doesn't pay for the same completions again.
+    # Its table is created by `manage.py createcachetable`, run after migrate.
+    'llm': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'picture_llm_cache',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'pictures.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -108,3 +143,18 @@ REST_FRAMEWORK = {
 
 NASA_API_KEY = config('NASA_API_KEY', default='DEMO_KEY')
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+
+# Let cleanup_old_pictures delete with one raw SQL statement per source
+# instead of through the ORM
+USE_RAW_CLEANUP = config('USE_RAW_CLEANUP', default=False, cast=bool)
+
+# Worker threads used by fetch_picture --fetch-all for the per-picture
+# metadata/download/OpenAI steps (1 runs them serially). SQLite allows one
+# writer at a time, so concurrent saves would fail with "database is locked"
+_DB_CONCURRENT_WRITES = 'sqlite3' not in DATABASES['default']['ENGINE']
+FETCH_WORKERS = config('FETCH_WORKERS', default=10 if _DB_CONCURRENT_WRITES else 1, cast=int)
+# Upper bound on concurrent OpenAI requests from those workers
+OPENAI_MAX_CONCURRENCY = config('OPENAI_MAX_CONCURRENCY', default=8, cast=int)
+# Retries on rate limits (429) and transient errors; the OpenAI client backs
+# off exponentially and honours the Retry-After header
+OPENAI_MAX_RETRIES = config('OPENAI_MAX_RETRIES', default=5, cast=int)
@@ -1,7 +1,12 @@
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Build the URL resolver at startup rather than on the first request. With
+# gunicorn --preload this happens once in the master and is shared by workers.
+get_resolver().url_patterns
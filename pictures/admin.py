@@ -1,158 +1,271 @@
 from django.contrib import admin
-from django.core.management import call_command
+from django.db import connections
+from django.db.models import CharField, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import StringIO
 import logging
-from .models import PictureOfTheDay, SourceConfiguration
+import re
+from .management.commands.fetch_picture import Command as FetchPictureCommand
+from .models import PictureOfTheDay, PictureSource, SourceConfiguration, disabled_sources
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on fetch_picture runs an admin action performs at once
+FETCH_MAX_WORKERS = 8
+
+# fetch_picture reports failures on stdout as lines starting with "Error"
+_RE_ERROR_LINE = re.compile(r'^\s*Error\b', re.MULTILINE)
+
+
+def _fetch_options(source):
+    """Build fetch_picture options for today's picture from a source"""
+    # Use fetch-all for Bing, regular fetch for others
+    if source == 'bing':
+        return {'source': source, 'fetch_all': True}
+    return {'source': source}
+
+
+def _fetch_one(label, options):
+    """
+    Run the fetch_picture command with the given options and log the outcome
+    
+    The command is instantiated directly and its handle() called, which
+    skips call_command's command lookup and argument parsing. A fresh
+    instance is used per run because it holds the output streams.
+    
+    The command writes its errors to stdout, so the run counts as failed
+    when the captured output has an error line.
+    
+    Returns:
+        tuple: (label, ok: bool, output: str) where output is the command
+        output, or the error message if the command raised
+    """
+    out = StringIO()
+    err = StringIO()
+    
+    try:
+        FetchPictureCommand(stdout=out, stderr=err).handle(**options)
+        
+        output = out.getvalue() + err.getvalue()
+        if err.getvalue() or _RE_ERROR_LINE.search(output):
+            logger.error(f"Error fetching {label}: {output}")
+            return label, False, output
+        logger.info(f"Successfully fetched {label}: {output}")
+        return label, True, output
+    except Exception as e:
+        logger.exception(f"Exception fetching {label}: {e}")
+        return label, False, str(e)
+    finally:
+        # Worker threads open their own database connections
+        connections.close_all()
+
+
+def _fetch_concurrently(jobs):
+    """
+    Run fetch_picture for each (label, options) job in a thread pool
+    
+    Fetches are network-bound, so running them side by side makes an
+    action take as long as the slowest source rather than the sum of all.
+    
+    Returns:
+        list: (label, ok, output) tuples in completion order
+    """
+    if not jobs:
+        return []
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(jobs))) as executor:
+        futures = [executor.submit(_fetch_one, label, options) for label, options in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+def _run_fetch(modeladmin, request, items, label_of, get_kwargs, is_enabled=None):
+    """
+    Run fetch_picture for each item and report the outcome to the admin user
+    
+    Shared by all the fetch actions, which only differ in what they fetch.
+    
+    Args:
+        modeladmin: The ModelAdmin running the action
+        request: The admin request
+        items: Iterable of items to fetch, opaque to this function
+        label_of: Returns the human-readable label for an item
+        get_kwargs: Returns the fetch_picture options for an item
+        is_enabled: Returns whether an item's source is enabled; items
+            from disabled sources are skipped. All items are fetched if None.
+    """
+    success_count = 0
+    errors = []
+    skipped = []
+    jobs = []
+    
+    for item in items:
+        label = label_of(item)
+        if is_enabled is not None and not is_enabled(item):
+            skipped.append(f"{label}: Source is disabled")
+            continue
+        jobs.append((label, get_kwargs(item)))
+    
+    for label, ok, output in _fetch_concurrently(jobs):
+        if ok:
+            success_count += 1
+        else:
+            errors.append(f"{label}: {output}")
+    
+    # Build message
+    messages = []
+    if success_count > 0:
+        messages.append(f"Successfully ran {success_count} fetch(es).")
+    if errors:
+        messages.append(f"Failed {len(errors)} fetch(es).")
+        for error in errors:
+            messages.append(f"  - {error}")
+    if skipped:
+        messages.append(f"Skipped {len(skipped)} fetch(es).")
+        for error in skipped:
+            messages.append(f"  - {error}")
+    
+    modeladmin.message_user(request, "\n".join(messages) if messages else "Nothing to fetch.")
+
 
 @admin.register(PictureOfTheDay)
 class PictureOfTheDayAdmin(admin.ModelAdmin):
-    list_display = ['source', 'date', 'title', 'is_processed', 'image_resolution', 'image_size_mb', 'created_at']
+    list_display = ['source', 'date', 'title', 'is_processed', 'image_resolution_display', 'image_size_mb_display', 'created_at']
     list_filter = ['source', 'is_processed', 'media_type', 'date']
     search_fields = ['title', 'original_explanation']
-    readonly_fields = ['created_at', 'updated_at', 'display_explanation', 'display_image_url', 'image_size_mb', 'image_resolution']
+    readonly_fields = ['created_at', 'updated_at', 'explanation_display', 'image_url_display', 'image_size_mb_display', 'image_resolution_display']
     date_hierarchy = 'date'
     actions = ['fetch_today_for_source', 'refetch_selected']
+    # No relations to follow; keeps the changelist from guessing joins
+    list_select_related = False
+    # Skip the unfiltered COUNT(*) the changelist runs alongside the
+    # filtered one, and keep pages small
+    show_full_result_count = False
+    list_per_page = 50
+    list_max_show_all = 200
+    # Columns needed to render the changelist rows (list_display and __str__);
+    # the explanation text columns are left out of the changelist SELECT.
+    changelist_fields = [
+        'id', 'source', 'date', 'title', 'is_processed',
+        'image_size_mb_cached', 'image_resolution_cached', 'created_at',
+    ]
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('source', 'date', 'title', 'media_type')
         }),
         ('Content', {
-            'fields': ('original_explanation', 'simplified_explanation', 'processed_explanation', 'display_explanation')
+            'fields': ('original_explanation', 'simplified_explanation', 'processed_explanation', 'explanation_display')
         }),
         ('Images', {
             'fields': ('image_url', 'hd_image_url', 'thumbnail_url', 'local_image_path', 
-                      'image_width', 'image_height', 'image_size_bytes', 'image_size_mb', 'image_resolution', 'display_image_url')
+                      'image_width', 'image_height', 'image_size_bytes', 'image_size_mb_display', 'image_resolution_display', 'image_url_display')
         }),
         ('Metadata', {
             'fields': ('copyright', 'source_url')
         }),
         ('Processing', {
-            'fields': ('is_processed', 'processing_error')
+            'fields': ('is_processed', 'processing_error', 'processing_started_at')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at')
         }),
     )
     
+    def get_queryset(self, request):
+        """Narrow the changelist query to the columns it displays"""
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        changelist_url = f'{self.opts.app_label}_{self.opts.model_name}_changelist'
+        if match and match.url_name == changelist_url:
+            queryset = queryset.only(*self.changelist_fields)
+        else:
+            # Same fallbacks as the model's display_* properties, with
+            # empty strings skipped like the properties' `or` chains
+            queryset = queryset.annotate(
+                display_explanation_db=Coalesce(
+                    NullIf('processed_explanation', Value('')),
+                    NullIf('simplified_explanation', Value('')),
+                    'original_explanation',
+                    output_field=TextField(),
+                ),
+                display_image_url_db=Coalesce(
+                    NullIf('local_image_path', Value('')),
+                    NullIf('hd_image_url', Value('')),
+                    'image_url',
+                    output_field=CharField(),
+                ),
+            )
+        return queryset
+    
+    @admin.display(description='Display explanation')
+    def explanation_display(self, obj):
+        return obj.display_explanation_db
+    
+    @admin.display(description='Display image URL')
+    def image_url_display(self, obj):
+        return obj.display_image_url_db
+    
+    @admin.display(description='Image resolution', ordering='image_resolution_cached')
+    def image_resolution_display(self, obj):
+        return obj.image_resolution_cached
+    
+    @admin.display(description='Image size (MB)', ordering='image_size_mb_cached')
+    def image_size_mb_display(self, obj):
+        return obj.image_size_mb_cached
+    
     def fetch_today_for_source(self, request, queryset):
         """Fetch today's picture for the source of selected pictures"""
-        # Get unique sources from selected pictures
-        sources = queryset.values_list('source', flat=True).distinct()
+        # Get unique sources from selected pictures; clear the default
+        # ordering so it doesn't become part of the DISTINCT
+        sources = queryset.order_by().values_list('source', flat=True).distinct()
         
         if not sources:
             self.message_user(request, "No pictures selected.", level='warning')
             return
         
-        success_count = 0
-        error_count = 0
-        errors = []
-        
-        for source in sources:
-            # Check if source is enabled
-            if not SourceConfiguration.is_source_enabled(source):
-                errors.append(f"{source}: Source is disabled")
-                error_count += 1
-                continue
-            
-            out = StringIO()
-            err = StringIO()
-            
-            try:
-                # Use fetch-all for Bing, regular fetch for others
-                if source == 'bing':
-                    call_command('fetch_picture', source=source, fetch_all=True, stdout=out, stderr=err)
-                else:
-                    call_command('fetch_picture', source=source, stdout=out, stderr=err)
-                
-                output = out.getvalue()
-                error_output = err.getvalue()
-                
-                if error_output:
-                    errors.append(f"{source}: {error_output}")
-                    error_count += 1
-                    logger.error(f"Error fetching {source}: {error_output}")
-                else:
-                    success_count += 1
-                    logger.info(f"Successfully fetched {source}: {output}")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                errors.append(f"{source}: {error_msg}")
-                error_count += 1
-                logger.exception(f"Exception fetching {source}: {error_msg}")
-        
-        # Build message
-        messages = []
-        if success_count > 0:
-            messages.append(f"Successfully fetched today's pictures for {success_count} source(s).")
-        if error_count > 0:
-            messages.append(f"Failed to fetch pictures for {error_count} source(s).")
-            for error in errors:
-                messages.append(f"  - {error}")
-        
-        self.message_user(request, "\n".join(messages) if messages else "No sources processed.")
+        disabled = disabled_sources()
+        _run_fetch(
+            self, request, sources,
+            label_of=lambda source: source,
+            get_kwargs=_fetch_options,
+            is_enabled=lambda source: source not in disabled,
+        )
     
     fetch_today_for_source.short_description = "Fetch today's picture for selected picture sources"
     
     def refetch_selected(self, request, queryset):
         """Re-fetch and re-process selected pictures (with --force flag)"""
-        success_count = 0
-        error_count = 0
-        errors = []
-        
         # Group by source and date to avoid duplicate fetches
-        source_date_pairs = queryset.values_list('source', 'date').distinct()
+        source_date_pairs = list(queryset.order_by().values_list('source', 'date').distinct())
+        
+        # Bing uses fetch-all, which ignores the date, so all selected
+        # Bing pictures are covered by a single run
+        items = [(source, picture_date) for source, picture_date in source_date_pairs if source != 'bing']
+        bing_count = len(source_date_pairs) - len(items)
+        if bing_count:
+            items.append(('bing', None))
         
-        for source, picture_date in source_date_pairs:
-            # Check if source is enabled
-            if not SourceConfiguration.is_source_enabled(source):
-                errors.append(f"{source} ({picture_date}): Source is disabled")
-                error_count += 1
-                continue
-            
-            out = StringIO()
-            err = StringIO()
-            
-            try:
-                date_str = picture_date.strftime('%Y-%m-%d')
-                
-                # Use fetch-all for Bing, regular fetch for others
-                if source == 'bing':
-                    call_command('fetch_picture', source=source, date=date_str, force=True, fetch_all=True, stdout=out, stderr=err)
-                else:
-                    call_command('fetch_picture', source=source, date=date_str, force=True, stdout=out, stderr=err)
-                
-                output = out.getvalue()
-                error_output = err.getvalue()
-                
-                if error_output:
-                    errors.append(f"{source} ({picture_date}): {error_output}")
-                    error_count += 1
-                    logger.error(f"Error refetching {source} for {picture_date}: {error_output}")
-                else:
-                    success_count += 1
-                    logger.info(f"Successfully refetched {source} for {picture_date}: {output}")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                errors.append(f"{source} ({picture_date}): {error_msg}")
-                error_count += 1
-                logger.exception(f"Exception refetching {source} for {picture_date}: {error_msg}")
+        def label_of(item):
+            source, picture_date = item
+            if source == 'bing':
+                return f"bing ({bing_count} date(s))"
+            return f"{source} ({picture_date})"
         
-        # Build message
-        messages = []
-        if success_count > 0:
-            messages.append(f"Successfully refetched {success_count} picture(s).")
-        if error_count > 0:
-            messages.append(f"Failed to refetch {error_count} picture(s).")
-            for error in errors:
-                messages.append(f"  - {error}")
+        def get_kwargs(item):
+            source, picture_date = item
+            if source == 'bing':
+                return {'source': 'bing', 'force': True, 'fetch_all': True}
+            return {'source': source, 'date': picture_date.strftime('%Y-%m-%d'), 'force': True}
         
-        self.message_user(request, "\n".join(messages) if messages else "No pictures processed.")
+        disabled = disabled_sources()
+        _run_fetch(
+            self, request, items, label_of, get_kwargs,
+            is_enabled=lambda item: item[0] not in disabled,
+        )
     
     refetch_selected.short_description = "Re-fetch and re-process selected pictures"
 
@@ -177,121 +290,43 @@ class SourceConfigurationAdmin(admin.ModelAdmin):
     
     def enable_sources(self, request, queryset):
         """Enable selected sources"""
-        queryset.update(is_enabled=True)
-        self.message_user(request, f"{queryset.count()} source(s) enabled.")
+        updated = queryset.update(is_enabled=True)
+        self.message_user(request, f"{updated} source(s) enabled.")
     enable_sources.short_description = "Enable selected sources"
     
     def disable_sources(self, request, queryset):
         """Disable selected sources"""
-        queryset.update(is_enabled=False)
-        self.message_user(request, f"{queryset.count()} source(s) disabled.")
+        updated = queryset.update(is_enabled=False)
+        self.message_user(request, f"{updated} source(s) disabled.")
     disable_sources.short_description = "Disable selected sources"
     
     def fetch_selected_sources(self, request, queryset):
         """Fetch pictures for selected sources"""
-        success_count = 0
-        error_count = 0
-        errors = []
-        
-        for source_config in queryset:
-            if not source_config.is_enabled:
-                errors.append(f"{source_config.label}: Source is disabled")
-                error_count += 1
-                continue
-            
-            source = source_config.source
-            out = StringIO()
-            err = StringIO()
-            
-            try:
-                # Use fetch-all for Bing, regular fetch for others
-                if source == 'bing':
-                    call_command('fetch_picture', source=source, fetch_all=True, stdout=out, stderr=err)
-                else:
-                    call_command('fetch_picture', source=source, stdout=out, stderr=err)
-                
-                output = out.getvalue()
-                error_output = err.getvalue()
-                
-                if error_output:
-                    errors.append(f"{source_config.label}: {error_output}")
-                    error_count += 1
-                    logger.error(f"Error fetching {source}: {error_output}")
-                else:
-                    success_count += 1
-                    logger.info(f"Successfully fetched {source}: {output}")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                errors.append(f"{source_config.label}: {error_msg}")
-                error_count += 1
-                logger.exception(f"Exception fetching {source}: {error_msg}")
-        
-        # Build message
-        messages = []
-        if success_count > 0:
-            messages.append(f"Successfully fetched pictures for {success_count} source(s).")
-        if error_count > 0:
-            messages.append(f"Failed to fetch pictures for {error_count} source(s).")
-            for error in errors:
-                messages.append(f"  - {error}")
-        
-        self.message_user(request, "\n".join(messages) if messages else "No sources processed.")
+        _run_fetch(
+            self, request, queryset,
+            label_of=lambda config: config.label,
+            get_kwargs=lambda config: _fetch_options(config.source),
+            is_enabled=lambda config: config.is_enabled,
+        )
     
     fetch_selected_sources.short_description = "Fetch pictures for selected sources"
     
     def fetch_all_enabled_sources(self, request, queryset):
         """Fetch pictures for all enabled sources"""
-        enabled_sources = SourceConfiguration.objects.filter(is_enabled=True)
+        # Only the source and its label are needed, so skip building model
+        # instances and the separate exists() query
+        enabled_sources = list(
+            SourceConfiguration.objects.filter(is_enabled=True).values('source', 'display_name')
+        )
         
-        if not enabled_sources.exists():
+        if not enabled_sources:
             self.message_user(request, "No enabled sources found.", level='warning')
             return
         
-        success_count = 0
-        error_count = 0
-        errors = []
-        
-        for source_config in enabled_sources:
-            source = source_config.source
-            out = StringIO()
-            err = StringIO()
-            
-            try:
-                # Use fetch-all for Bing, regular fetch for others
-                if source == 'bing':
-                    call_command('fetch_picture', source=source, fetch_all=True, stdout=out, stderr=err)
-                else:
-                    call_command('fetch_picture', source=source, stdout=out, stderr=err)
-                
-                output = out.getvalue()
-                error_output = err.getvalue()
-                
-                if error_output:
-                    errors.append(f"{source_config.label}: {error_output}")
-                    error_count += 1
-                    logger.error(f"Error fetching {source}: {error_output}")
-                else:
-                    success_count += 1
-                    logger.info(f"Successfully fetched {source}: {output}")
-                    
-            except Exception as e:
-                error_msg = str(e)
-                errors.append(f"{source_config.label}: {error_msg}")
-                error_count += 1
-                logger.exception(f"Exception fetching {source}: {error_msg}")
-        
-        # Build message
-        messages = []
-        if success_count > 0:
-            messages.append(f"Successfully fetched pictures for {success_count} enabled source(s).")
-        if error_count > 0:
-            messages.append(f"Failed to fetch pictures for {error_count} source(s).")
-            for error in errors:
-                messages.append(f"  - {error}")
-        
-        self.message_user(request, "\n".join(messages) if messages else "No sources processed.")
+        _run_fetch(
+            self, request, enabled_sources,
+            label_of=lambda config: config['display_name'] or PictureSource(config['source']).label,
+            get_kwargs=lambda config: _fetch_options(config['source']),
+        )
     
     fetch_all_enabled_sources.short_description = "Fetch pictures for all enabled sources"
-
-
@@ -3,11 +3,168 @@ Base fetcher interface and implementations for different picture sources
 """
 import re
 import os
+import functools
+import json
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from html.parser import HTMLParser
 from typing import Dict, Any
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson decodes the API responses faster; the stdlib is the fallback
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+USER_AGENT = 'PictureOfTheDay/1.0 (https://github.com/yourusername/picture)'
+
+
+def _build_session() -> requests.Session:
+    """
+    Build the HTTP session shared by all fetchers
+    
+    Keeps connections to the upstream APIs alive between calls and retries
+    transient failures with backoff.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+_SESSION = _build_session()
+
+
+# Wikitext patterns for Template:POTD pages
+_RE_TEXTTITLE = re.compile(r'\|\s*texttitle\s*=\s*(.+?)(?:\n|$)')
+_RE_TITLE_PIPED_LINK = re.compile(r'\|\s*title\s*=\s*\[\[([^\]]+)\|([^\]]+)\]\]')
+_RE_TITLE_LINK = re.compile(r'\|\s*title\s*=\s*\[\[([^\]]+)\]\]')
+_RE_CAPTION = re.compile(r'\|\s*caption\s*=\s*(.+?)(?:\n\s*\||$)', re.DOTALL)
+_RE_WIKILINK_PIPE = re.compile(r'\[\[([^\]]+)\|([^\]]+)\]\]')
+_RE_WIKILINK = re.compile(r'\[\[([^\]]+)\]\]')
+_RE_BOLD = re.compile(r"'''([^']+)'''")
+_RE_ITALIC = re.compile(r"''([^']+)''")
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# Trailing credit and archive links cut from the parsed POTD HTML description
+_RE_PHOTO_CREDIT = re.compile(r'Photograph credit:.*$', re.DOTALL)
+_RE_ARCHIVE = re.compile(r'Archive.*$', re.DOTALL)
+
+# Filename noise stripped when deriving a title from an image filename
+_RE_FILENAME_ISO_DATE = re.compile(r',?\s*\d{4}[-_]\d{2}[-_]\d{2}\s*,?')
+_RE_FILENAME_COMPACT_DATE = re.compile(r',?\s*\d{8}\s*,?')
+_RE_FILENAME_TRAILING_CODE = re.compile(r',?\s+[A-Z]{2,}(\s+[0-9-]+)?\s*$')
+_RE_FILENAME_DD = re.compile(r',?\s+DD\s+\d+-\d+\s*')
+_RE_FILENAME_INITIALS = re.compile(r',?\s+[A-Z]\s+[A-Z]-\w\s*')
+_RE_FILENAME_LEADING_NUMBER = re.compile(r'^\d+\s+')
+_RE_FILENAME_TRAILING_ABBR = re.compile(r',?\s+[A-Z]{3}\s*$')
+_RE_TRAILING_COMMAS = re.compile(r',+\s*$')
+_RE_REPEATED_COMMAS = re.compile(r',\s*,')
+_RE_COMMA_SPACING = re.compile(r'\s*,\s*')
+
+# Bing image URLs carry a resolution, e.g. _1920x1080.jpg, that is swapped for UHD
+_RE_BING_RESOLUTION = re.compile(r'_\d+x\d+\.jpg')
+_RE_BING_RF = re.compile(r'rf=LaDigue_\d+x\d+\.jpg')
+
+# Runs independent upstream requests of a single fetch side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='fetcher')
+
+# Upper bound on cached fetch results (one per source and date)
+FETCH_CACHE_SIZE = 512
+
+_fetch_cache = OrderedDict()
+_fetch_cache_lock = threading.Lock()
+
+# Key a fetch() result sets to keep itself out of the cache, e.g. when the
+# source returned a stand-in for the requested date. Removed before returning.
+_UNCACHEABLE = '_uncacheable'
+
+
+def _cache_past_dates(fetch):
+    """
+    Cache a fetcher's fetch() results in-process, keyed by source and date
+    
+    Pictures for past dates don't change upstream, so repeat fetches skip
+    the network. Today's and future dates always go upstream, since those
+    can still change, as do results marked with _UNCACHEABLE. Pass
+    refresh=True to skip the cache lookup and replace the cached entry.
+    """
+    @functools.wraps(fetch)
+    def wrapper(self, target_date: date, refresh: bool = False) -> Dict[str, Any]:
+        if target_date >= date.today():
+            data = fetch(self, target_date)
+            data.pop(_UNCACHEABLE, None)
+            return data
+        
+        key = (self.source_name, target_date)
+        if not refresh:
+            with _fetch_cache_lock:
+                if key in _fetch_cache:
+                    _fetch_cache.move_to_end(key)
+                    return dict(_fetch_cache[key])
+        
+        data = fetch(self, target_date)
+        if data.pop(_UNCACHEABLE, False):
+            return data
+        
+        with _fetch_cache_lock:
+            _fetch_cache[key] = data
+            _fetch_cache.move_to_end(key)
+            while len(_fetch_cache) > FETCH_CACHE_SIZE:
+                _fetch_cache.popitem(last=False)
+        # Callers get their own copy so they can't alter the cached entry
+        return dict(data)
+    
+    return wrapper
+
+
+class _DescriptionDivParser(HTMLParser):
+    """
+    Collect the text of the first <div style="padding-top: 0.3em;">, which
+    holds the description in the parsed Template:POTD HTML
+    
+    Entities are decoded in the collected text (convert_charrefs).
+    """
+    
+    DESCRIPTION_STYLE = 'padding-top: 0.3em;'
+    
+    def __init__(self):
+        super().__init__()
+        self.found = False
+        self.depth = 0
+        self.parts = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag != 'div':
+            return
+        if self.depth:
+            self.depth += 1
+        elif not self.found and dict(attrs).get('style') == self.DESCRIPTION_STYLE:
+            self.found = True
+            self.depth = 1
+    
+    def handle_endtag(self, tag):
+        if tag == 'div' and self.depth:
+            self.depth -= 1
+    
+    def handle_data(self, data):
+        if self.depth:
+            self.parts.append(data)
 
 
 class BasePictureFetcher(ABC):
@@ -41,6 +198,12 @@ class BasePictureFetcher(ABC):
     def get_source_url(self, picture_date: date) -> str:
         """Get the URL to the original source page"""
         pass
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop all cached fetch results"""
+        with _fetch_cache_lock:
+            _fetch_cache.clear()
 
 
 class APODFetcher(BasePictureFetcher):
@@ -48,6 +211,7 @@ class APODFetcher(BasePictureFetcher):
     
     source_name = 'apod'
     
+    @_cache_past_dates
     def fetch(self, target_date: date) -> Dict[str, Any]:
         """Fetch APOD from NASA API"""
         api_key = settings.NASA_API_KEY
@@ -58,10 +222,10 @@ class APODFetcher(BasePictureFetcher):
             'date': target_date.strftime('%Y-%m-%d')
         }
         
-        response = requests.get(url, params=params, timeout=30)
+        response = _SESSION.get(url, params=params, timeout=30)
         response.raise_for_status()
         
-        data = response.json()
+        data = _json_loads(response.content)
         
         date_str = data['date'].replace('-', '')[2:]
         nasa_url = f"https://apod.nasa.gov/apod/ap{date_str}.html"
@@ -89,6 +253,7 @@ class WikipediaPODFetcher(BasePictureFetcher):
     
     source_name = 'wikipedia'
     
+    @_cache_past_dates
     def fetch(self, target_date: date) -> Dict[str, Any]:
         """Fetch Wikipedia Picture of the Day using MediaWiki API"""
         endpoint = "https://en.wikipedia.org/w/api.php"
@@ -96,31 +261,37 @@ class WikipediaPODFetcher(BasePictureFetcher):
         template_title = f"Template:POTD protected/{date_iso}"
         potd_template_title = f"Template:POTD/{date_iso}"
         
-        headers = {
-            'User-Agent': 'PictureOfTheDay/1.0 (https://github.com/yourusername/picture)'
-        }
+        # The description only depends on the date, so fetch it while the
+        # image lookups below run
+        description_future = _EXECUTOR.submit(self._fetch_potd_description, potd_template_title, endpoint)
         
+        # generator=images resolves the template's images and their URLs in
+        # one request instead of an images lookup followed by an imageinfo one
         params = {
             "action": "query",
             "format": "json",
             "formatversion": "2",
-            "prop": "images",
-            "titles": template_title
+            "generator": "images",
+            "titles": template_title,
+            "prop": "imageinfo",
+            "iiprop": "url"
         }
         
-        response = requests.get(endpoint, params=params, headers=headers, timeout=30)
+        response = _SESSION.get(endpoint, params=params, timeout=30)
         response.raise_for_status()
-        data = response.json()
+        data = _json_loads(response.content)
         
-        pages = data.get('query', {}).get('pages', [])
-        if not pages or 'images' not in pages[0] or not pages[0]['images']:
+        pages = [page for page in data.get('query', {}).get('pages', []) if page.get('imageinfo')]
+        if not pages:
+            description_future.cancel()
             raise ValueError(f"No POTD found for {date_iso}")
         
-        filename = pages[0]['images'][0]['title']
+        # prop=images listed titles alphabetically; keep picking the first
+        page = min(pages, key=lambda page: page['title'])
+        filename = page['title']
+        image_url = page['imageinfo'][0]['url']
         
-        image_url = self._fetch_image_url(filename, endpoint, headers)
-        
-        explanation, title = self._fetch_potd_description(potd_template_title, endpoint, headers)
+        explanation, title = description_future.result()
         
         if not title:
             clean_filename = filename
@@ -142,28 +313,7 @@ class WikipediaPODFetcher(BasePictureFetcher):
             'source_url': source_url,
         }
     
-    def _fetch_image_url(self, filename: str, endpoint: str, headers: dict) -> str:
-        """Fetch the full resolution image URL from MediaWiki API"""
-        params = {
-            "action": "query",
-            "format": "json",
-            "formatversion": "2",
-            "prop": "imageinfo",
-            "iiprop": "url",
-            "titles": filename
-        }
-        
-        response = requests.get(endpoint, params=params, headers=headers, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        pages = data.get('query', {}).get('pages', [])
-        if not pages or 'imageinfo' not in pages[0] or not pages[0]['imageinfo']:
-            raise ValueError(f"Could not fetch image URL for {filename}")
-        
-        return pages[0]['imageinfo'][0]['url']
-    
-    def _fetch_potd_description(self, template_title: str, endpoint: str, headers: dict) -> tuple:
+    def _fetch_potd_description(self, template_title: str, endpoint: str) -> tuple:
         """Fetch the description and title from Template:POTD/{date}"""
         params = {
             "action": "query",
@@ -176,9 +326,9 @@ class WikipediaPODFetcher(BasePictureFetcher):
         }
         
         try:
-            response = requests.get(endpoint, params=params, headers=headers, timeout=30)
+            response = _SESSION.get(endpoint, params=params, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = _json_loads(response.content)
             
             pages = data.get('query', {}).get('pages', [])
             if pages and 'revisions' in pages[0] and pages[0]['revisions']:
@@ -200,9 +350,9 @@ class WikipediaPODFetcher(BasePictureFetcher):
                 "prop": "text",
                 "section": "0"
             }
-            response = requests.get(endpoint, params=params, headers=headers, timeout=30)
+            response = _SESSION.get(endpoint, params=params, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = _json_loads(response.content)
             
             if 'parse' in data and 'text' in data['parse']:
                 html_content = data['parse']['text']['*']
@@ -220,20 +370,20 @@ class WikipediaPODFetcher(BasePictureFetcher):
         explanation = None
         title = None
         
-        title_match = re.search(r'\|\s*texttitle\s*=\s*(.+?)(?:\n|$)', wikitext)
+        title_match = _RE_TEXTTITLE.search(wikitext)
         if not title_match:
-            title_match = re.search(r'\|\s*title\s*=\s*\[\[([^\]]+)\|([^\]]+)\]\]', wikitext)
+            title_match = _RE_TITLE_PIPED_LINK.search(wikitext)
             if title_match:
                 title = title_match.group(2)
             else:
-                title_match = re.search(r'\|\s*title\s*=\s*\[\[([^\]]+)\]\]', wikitext)
+                title_match = _RE_TITLE_LINK.search(wikitext)
                 if title_match:
                     title = title_match.group(1)
         
         if title_match and not title:
             title = title_match.group(1).strip()
         
-        caption_match = re.search(r'\|\s*caption\s*=\s*(.+?)(?:\n\s*\||$)', wikitext, re.DOTALL)
+        caption_match = _RE_CAPTION.search(wikitext)
         if caption_match:
             explanation = caption_match.group(1).strip()
             explanation = self._clean_wikitext(explanation)
@@ -243,37 +393,36 @@ class WikipediaPODFetcher(BasePictureFetcher):
     def _clean_wikitext(self, text: str) -> str:
         """Clean wikitext markup to plain text"""
         
-        text = re.sub(r'\[\[([^\]]+)\|([^\]]+)\]\]', r'\2', text)
-        text = re.sub(r'\[\[([^\]]+)\]\]', r'\1', text)
+        text = _RE_WIKILINK_PIPE.sub(r'\2', text)
+        text = _RE_WIKILINK.sub(r'\1', text)
         
-        text = re.sub(r"'''([^']+)'''", r'\1', text)
-        text = re.sub(r"''([^']+)''", r'\1', text)
+        text = _RE_BOLD.sub(r'\1', text)
+        text = _RE_ITALIC.sub(r'\1', text)
         
         text = text.replace('&nbsp;', ' ')
         text = text.replace('&amp;', '&')
         text = text.replace('&lt;', '<')
         text = text.replace('&gt;', '>')
         
-        text = re.sub(r'\s+', ' ', text)
+        text = _RE_WHITESPACE.sub(' ', text)
         text = text.strip()
         
         return text
     
     def _extract_description_from_html(self, html: str) -> tuple:
         """Extract description text from parsed HTML"""
-        import re
-        import html as html_module
-        
-        match = re.search(r'<div style="padding-top: 0\.3em;">(.+?)</div>', html, re.DOTALL)
-        if match:
-            description_html = match.group(1)
-            text = re.sub(r'<[^>]+>', '', description_html)
-            text = re.sub(r'Photograph credit:.*$', '', text, flags=re.DOTALL)
-            text = re.sub(r'Archive.*$', '', text, flags=re.DOTALL)
-            text = html_module.unescape(text.strip())
+        
+        parser = _DescriptionDivParser()
+        parser.feed(html)
+        parser.close()
+        
+        if parser.found:
+            text = ''.join(parser.parts)
+            text = _RE_PHOTO_CREDIT.sub('', text)
+            text = _RE_ARCHIVE.sub('', text)
+            text = text.strip()
             
-            title_match = re.search(r'^([^\.]+)', text)
-            title = title_match.group(1).strip() if title_match else None
+            title = text.split('.', 1)[0].strip() or None
             
             return text, title
         
@@ -290,21 +439,21 @@ class WikipediaPODFetcher(BasePictureFetcher):
         
         filename = filename.replace('_', ' ')
         
-        filename = re.sub(r',?\s*\d{4}[-_]\d{2}[-_]\d{2}\s*,?', ' ', filename)
-        filename = re.sub(r',?\s*\d{8}\s*,?', ' ', filename)
+        filename = _RE_FILENAME_ISO_DATE.sub(' ', filename)
+        filename = _RE_FILENAME_COMPACT_DATE.sub(' ', filename)
         
-        filename = re.sub(r',?\s+[A-Z]{2,}(\s+[0-9-]+)?\s*$', '', filename)
-        filename = re.sub(r',?\s+DD\s+\d+-\d+\s*', ' ', filename)
-        filename = re.sub(r',?\s+[A-Z]\s+[A-Z]-\w\s*', ' ', filename)
+        filename = _RE_FILENAME_TRAILING_CODE.sub('', filename)
+        filename = _RE_FILENAME_DD.sub(' ', filename)
+        filename = _RE_FILENAME_INITIALS.sub(' ', filename)
         
-        filename = re.sub(r'^\d+\s+', '', filename)
+        filename = _RE_FILENAME_LEADING_NUMBER.sub('', filename)
         
-        filename = re.sub(r',?\s+[A-Z]{3}\s*$', '', filename)
+        filename = _RE_FILENAME_TRAILING_ABBR.sub('', filename)
         
-        filename = re.sub(r',+\s*$', '', filename)  # Remove trailing commas
-        filename = re.sub(r'\s+', ' ', filename)  # Multiple spaces to single
-        filename = re.sub(r',\s*,', ',', filename)  # Multiple commas to single
-        filename = re.sub(r'\s*,\s*', ', ', filename)  # Normalize comma spacing
+        filename = _RE_TRAILING_COMMAS.sub('', filename)  # Remove trailing commas
+        filename = _RE_WHITESPACE.sub(' ', filename)  # Multiple spaces to single
+        filename = _RE_REPEATED_COMMAS.sub(',', filename)  # Multiple commas to single
+        filename = _RE_COMMA_SPACING.sub(', ', filename)  # Normalize comma spacing
         
         filename = filename.strip()
         if filename:
@@ -324,6 +473,7 @@ class BingPODFetcher(BasePictureFetcher):
     
     source_name = 'bing'
     
+    @_cache_past_dates
     def fetch(self, target_date: date) -> Dict[str, Any]:
         """Fetch Bing Picture of the Day"""
         # Bing HPImageArchive API
@@ -332,8 +482,7 @@ class BingPODFetcher(BasePictureFetcher):
         # We'll fetch multiple days and find the one matching our target date
         
         # Calculate days offset from today
-        from datetime import date as date_class
-        today = date_class.today()
+        today = date.today()
         days_offset = (today - target_date).days
         
         if days_offset < 0:
@@ -347,34 +496,22 @@ class BingPODFetcher(BasePictureFetcher):
         
         api_url = f"https://www.bing.com/HPImageArchive.aspx?format=js&idx=0&n={n}&mkt=en-US"
         
-        headers = {
-            'User-Agent': 'PictureOfTheDay/1.0 (https://github.com/yourusername/picture)'
-        }
-        response = requests.get(api_url, headers=headers, timeout=30)
+        response = _SESSION.get(api_url, timeout=30)
         response.raise_for_status()
         
-        data = response.json()
+        data = _json_loads(response.content)
         images = data.get('images', [])
         
         if not images:
             raise ValueError("No Bing images available")
         
-        # Find image matching target date
+        # Find image matching target date; Bing's startdate is YYYYMMDD
+        target_key = target_date.strftime('%Y%m%d')
         matching_image = None
         for img in images:
-            img_date_str = img.get('startdate', '')
-            if img_date_str:
-                try:
-                    img_date = date_class(
-                        int(img_date_str[:4]),   # year
-                        int(img_date_str[4:6]),  # month
-                        int(img_date_str[6:8])   # day
-                    )
-                    if img_date == target_date:
-                        matching_image = img
-                        break
-                except (ValueError, IndexError):
-                    continue
+            if img.get('startdate', '') == target_key:
+                matching_image = img
+                break
         
         # If no exact match, use the first image (today's)
         if not matching_image:
@@ -396,18 +533,7 @@ class BingPODFetcher(BasePictureFetcher):
             image_url = image_path
         
         # Get full resolution URL (Bing provides UHD versions)
-        # Bing URL format: /th?id=OHR.ImageName_1920x1080.jpg&rf=LaDigue_1920x1080.jpg&pid=hp
-        # UHD format: /th?id=OHR.ImageName_UHD.jpg&rf=LaDigue_UHD.jpg&pid=hp
-        hd_url = image_url
-        # Try to construct UHD URL
-        if '_' in image_url:
-            # Replace resolution with UHD
-            # Pattern: ..._1920x1080.jpg -> ..._UHD.jpg
-            import re
-            # Replace any resolution pattern (e.g., 1920x1080, 1366x768) with UHD
-            hd_url = re.sub(r'_\d+x\d+\.jpg', '_UHD.jpg', image_url)
-            # Also replace in rf parameter if present
-            hd_url = re.sub(r'rf=LaDigue_\d+x\d+\.jpg', 'rf=LaDigue_UHD.jpg', hd_url)
+        hd_url = self._uhd_url(image_url)
         
         # Get title and description
         title = matching_image.get('title', 'Bing Picture of the Day')
@@ -431,12 +557,30 @@ class BingPODFetcher(BasePictureFetcher):
             'media_type': 'image',
             'copyright': matching_image.get('copyright', ''),
             'source_url': source_url,
+            # A fallback image isn't the requested date's, so don't cache it
+            _UNCACHEABLE: matching_image.get('startdate') != target_key,
         }
     
     def get_source_url(self, picture_date: date) -> str:
         """Get Bing homepage URL"""
         return "https://www.bing.com"
     
+    def _uhd_url(self, image_url: str) -> str:
+        """
+        Get the UHD version of a Bing image URL
+        
+        Bing URL format: /th?id=OHR.ImageName_1920x1080.jpg&rf=LaDigue_1920x1080.jpg&pid=hp
+        UHD format: /th?id=OHR.ImageName_UHD.jpg&rf=LaDigue_UHD.jpg&pid=hp
+        """
+        # A single search finds URLs without a resolution to replace
+        match = _RE_BING_RESOLUTION.search(image_url)
+        if not match:
+            return image_url
+        
+        hd_url = image_url[:match.start()] + '_UHD.jpg' + image_url[match.end():]
+        # Also replace in rf parameter if present
+        return _RE_BING_RF.sub('rf=LaDigue_UHD.jpg', hd_url)
+    
     def fetch_all_available(self, max_days: int = 8) -> list:
         """
         Fetch all available Bing Pictures of the Day
@@ -450,68 +594,62 @@ class BingPODFetcher(BasePictureFetcher):
         n = min(max_days, 15)  # Bing API limit
         api_url = f"https://www.bing.com/HPImageArchive.aspx?format=js&idx=0&n={n}&mkt=en-US"
         
-        headers = {
-            'User-Agent': 'PictureOfTheDay/1.0 (https://github.com/yourusername/picture)'
-        }
-        response = requests.get(api_url, headers=headers, timeout=30)
+        response = _SESSION.get(api_url, timeout=30)
         response.raise_for_status()
         
-        data = response.json()
+        data = _json_loads(response.content)
         images = data.get('images', [])
         
         results = []
-        from datetime import date as date_class
         
         for img in images:
+            # startdate is YYYYMMDD
             img_date_str = img.get('startdate', '')
-            if img_date_str:
-                try:
-                    img_date = date_class(
-                        int(img_date_str[:4]),
-                        int(img_date_str[4:6]),
-                        int(img_date_str[6:8])
-                    )
-                    
-                    image_path = img.get('url', '')
-                    if image_path.startswith('/'):
-                        image_url = f"https://www.bing.com{image_path}"
-                    else:
-                        image_url = image_path
-                    
-                    # Get UHD version
-                    hd_url = image_url
-                    if '_' in image_url:
-                        import re
-                        hd_url = re.sub(r'_\d+x\d+\.jpg', '_UHD.jpg', image_url)
-                        hd_url = re.sub(r'rf=LaDigue_\d+x\d+\.jpg', 'rf=LaDigue_UHD.jpg', hd_url)
-                    
-                    results.append({
-                        'title': img.get('title', 'Bing Picture of the Day'),
-                        'date': img_date.strftime('%Y-%m-%d'),
-                        'explanation': img.get('copyright', ''),
-                        'image_url': image_url,
-                        'hd_image_url': hd_url,
-                        'thumbnail_url': image_url,
-                        'media_type': 'image',
-                        'copyright': img.get('copyright', ''),
-                        'source_url': 'https://www.bing.com',
-                    })
-                except (ValueError, IndexError):
-                    continue
+            if len(img_date_str) != 8 or not img_date_str.isdigit():
+                continue
+            # Drop impossible dates such as 20241345 here; one bad entry
+            # would otherwise fail the whole batch when it is saved
+            try:
+                img_date = date(int(img_date_str[:4]), int(img_date_str[4:6]), int(img_date_str[6:]))
+            except ValueError:
+                continue
+            
+            image_path = img.get('url', '')
+            if image_path.startswith('/'):
+                image_url = f"https://www.bing.com{image_path}"
+            else:
+                image_url = image_path
+            
+            # Get UHD version
+            hd_url = self._uhd_url(image_url)
+            
+            results.append({
+                'title': img.get('title', 'Bing Picture of the Day'),
+                'date': img_date.isoformat(),
+                'explanation': img.get('copyright', ''),
+                'image_url': image_url,
+                'hd_image_url': hd_url,
+                'thumbnail_url': image_url,
+                'media_type': 'image',
+                'copyright': img.get('copyright', ''),
+                'source_url': 'https://www.bing.com',
+            })
         
         return results
 
 
+# Fetchers hold no per-call state, so one instance of each is shared
+_FETCHERS = {
+    'apod': APODFetcher(),
+    'wikipedia': WikipediaPODFetcher(),
+    'bing': BingPODFetcher(),
+}
+
+
 def get_fetcher(source: str) -> BasePictureFetcher:
     """Factory function to get the appropriate fetcher"""
-    fetchers = {
-        'apod': APODFetcher(),
-        'wikipedia': WikipediaPODFetcher(),
-        'bing': BingPODFetcher(),
-    }
-    
-    if source not in fetchers:
-        raise ValueError(f"Unknown source: {source}. Available: {list(fetchers.keys())}")
-    
-    return fetchers[source]
+    try:
+        return _FETCHERS[source]
+    except KeyError:
+        raise ValueError(f"Unknown source: {source}. Available: {list(_FETCHERS.keys())}")
 
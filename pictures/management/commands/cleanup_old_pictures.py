@@ -4,7 +4,10 @@ Django management command to clean up old pictures from the database.
 This command removes pictures older than a specified number of days,
 with options to keep a minimum number of recent pictures per source.
 """
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q, Subquery
 from django.utils import timezone
 from datetime import timedelta
 from pictures.models import PictureOfTheDay, PictureSource
@@ -43,75 +46,104 @@ class Command(BaseCommand):
         keep_min = options['keep_min']
         source_filter = options.get('source')
         dry_run = options['dry_run']
+        # At verbosity 0 nothing is written and the dry-run examples aren't queried
+        verbose = options['verbosity'] >= 1
 
         cutoff_date = timezone.now().date() - timedelta(days=days)
         
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'\n=== Picture Cleanup {"(DRY RUN)" if dry_run else ""} ===\n'
+        if verbose:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'\n=== Picture Cleanup {"(DRY RUN)" if dry_run else ""} ===\n'
+                )
             )
-        )
-        self.stdout.write(f'Cutoff date: {cutoff_date} (keeping pictures from last {days} days)')
-        self.stdout.write(f'Minimum to keep per source: {keep_min}')
-        if source_filter:
-            self.stdout.write(f'Source filter: {source_filter}')
-        self.stdout.write('')
+            self.stdout.write(f'Cutoff date: {cutoff_date} (keeping pictures from last {days} days)')
+            self.stdout.write(f'Minimum to keep per source: {keep_min}')
+            if source_filter:
+                self.stdout.write(f'Source filter: {source_filter}')
+            self.stdout.write('')
 
         sources = [source_filter] if source_filter else [choice[0] for choice in PictureSource.choices]
         
         total_deleted = 0
         total_kept = 0
         
-        for source in sources:
-            queryset = PictureOfTheDay.objects.filter(source=source).order_by('-date')
-            total_count = queryset.count()
-            
-            old_pictures = queryset.filter(date__lt=cutoff_date)
-            old_count = old_pictures.count()
-            
-            recent_pictures = queryset.filter(date__gte=cutoff_date)
-            recent_count = recent_pictures.count()
-            
-            if recent_count < keep_min:
-                pictures_to_keep = queryset[:keep_min]
-                keep_ids = set(pictures_to_keep.values_list('id', flat=True))
-                pictures_to_delete = queryset.exclude(id__in=keep_ids)
-                delete_count = pictures_to_delete.count()
-            else:
-                pictures_to_delete = old_pictures
-                delete_count = old_count
-            
-            if delete_count > 0:
-                if dry_run:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'[{source.upper()}] Would delete {delete_count} pictures '
-                            f'(keeping {total_count - delete_count} recent ones)'
+        # Total and old picture counts for every source in one query
+        stats = {
+            row['source']: row
+            for row in PictureOfTheDay.objects.filter(source__in=sources)
+            .order_by()
+            .values('source')
+            .annotate(total=Count('id'), old=Count('id', filter=Q(date__lt=cutoff_date)))
+        }
+        
+        with transaction.atomic():
+            for source in sources:
+                # Collect the source's report and write it out in one go
+                lines = []
+                emit = lines.append
+                
+                source_stats = stats.get(source, {})
+                total_count = source_stats.get('total', 0)
+                
+                # Old pictures, except the keep_min most recent ones. Recent
+                # pictures are the newest, so this is every old picture
+                # beyond the first keep_min overall.
+                delete_count = min(source_stats.get('old', 0), max(0, total_count - keep_min))
+                
+                # The IDs to keep stay in the database as a subquery
+                queryset = PictureOfTheDay.objects.filter(source=source)
+                keep_ids = queryset.order_by('-date').values('pk')[:keep_min]
+                pictures_to_delete = (
+                    queryset.filter(date__lt=cutoff_date)
+                    .exclude(pk__in=Subquery(keep_ids))
+                    .order_by('-date')
+                )
+                
+                if delete_count > 0:
+                    if dry_run:
+                        emit(
+                            self.style.WARNING(
+                                f'[{source.upper()}] Would delete {delete_count} pictures '
+                                f'(keeping {total_count - delete_count} recent ones)'
+                            )
                         )
-                    )
-                    examples = pictures_to_delete[:5]
-                    for pic in examples:
-                        self.stdout.write(f'  - Would delete: {pic.date} - {pic.title[:50]}...')
-                    if delete_count > 5:
-                        self.stdout.write(f'  ... and {delete_count - 5} more')
+                        if verbose:
+                            # Only the listed columns, not the explanation texts
+                            examples = pictures_to_delete.only('id', 'date', 'title')[:5]
+                            for pic in examples:
+                                emit(f'  - Would delete: {pic.date} - {pic.title[:50]}...')
+                            if delete_count > 5:
+                                emit(f'  ... and {delete_count - 5} more')
+                    else:
+                        if settings.USE_RAW_CLEANUP:
+                            deleted = self.raw_delete(source, cutoff_date, keep_min)
+                        else:
+                            # PictureOfTheDay has no delete signals or related
+                            # models, so Django fast-deletes this with one
+                            # DELETE statement without fetching the rows
+                            deleted = pictures_to_delete.delete()[0]
+                        emit(
+                            self.style.SUCCESS(
+                                f'[{source.upper()}] Deleted {deleted} pictures '
+                                f'(kept {total_count - deleted} recent ones)'
+                            )
+                        )
+                        total_deleted += deleted
                 else:
-                    deleted = pictures_to_delete.delete()[0]
-                    self.stdout.write(
+                    emit(
                         self.style.SUCCESS(
-                            f'[{source.upper()}] Deleted {deleted} pictures '
-                            f'(kept {total_count - deleted} recent ones)'
+                            f'[{source.upper()}] No cleanup needed ({total_count} pictures, all within retention period)'
                         )
                     )
-                    total_deleted += deleted
-            else:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'[{source.upper()}] No cleanup needed ({total_count} pictures, all within retention period)'
-                    )
-                )
-            
-            total_kept += (total_count - delete_count)
-            self.stdout.write('')
+                
+                total_kept += (total_count - delete_count)
+                emit('')
+                if verbose:
+                    self.stdout.write(''.join(f'{line}\n' for line in lines), ending='')
+        
+        if not verbose:
+            return
         
         self.stdout.write('=' * 50)
         if dry_run:
@@ -127,4 +159,30 @@ class Command(BaseCommand):
                     f'\nCleanup complete: Deleted {total_deleted} pictures, kept {total_kept}'
                 )
             )
-        self.stdout.write('')
\ No newline at end of file
+        self.stdout.write('')
+
+    def raw_delete(self, source, cutoff_date, keep_min):
+        """
+        Delete a source's old pictures with a single server-side statement
+        
+        Unlike QuerySet.delete(), this doesn't fetch the rows first to send
+        signals or follow relations; PictureOfTheDay has neither.
+        
+        Returns:
+            int: Number of pictures deleted
+        """
+        qn = connection.ops.quote_name
+        table = qn(PictureOfTheDay._meta.db_table)
+        id_col, source_col, date_col = qn('id'), qn('source'), qn('date')
+        
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH keep AS ('
+                f'SELECT {id_col} FROM {table} WHERE {source_col} = %s '
+                f'ORDER BY {date_col} DESC LIMIT %s'
+                f') '
+                f'DELETE FROM {table} WHERE {source_col} = %s AND {date_col} < %s '
+                f'AND {id_col} NOT IN (SELECT {id_col} FROM keep)',
+                [source, keep_min, source, cutoff_date],
+            )
+            return cursor.rowcount
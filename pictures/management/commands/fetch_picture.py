@@ -2,13 +2,47 @@
 Unified command to fetch and process pictures from any source
 """
 import os
-from datetime import date, datetime
-from django.core.management.base import BaseCommand
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from functools import cached_property
+from io import StringIO
+from django.core.management.base import BaseCommand, OutputWrapper
 from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
 from pictures.models import PictureOfTheDay, PictureSource
 from pictures.fetchers import get_fetcher
 from pictures.processors import ImageProcessor, TextProcessor
-from pictures.utils import sanitize_html_entities
+from pictures.utils import explanation_hash, sanitize_html_entities
+
+
+SOURCE_CHOICES = [choice[0] for choice in PictureSource.choices]
+
+# Context mapping for all sources
+CONTEXT_MAP = {
+    'apod': 'astronomy',
+    'wikipedia': 'general',
+    'bing': 'general',
+}
+
+# Explanations shorter than this are shown as is rather than sent to OpenAI
+MIN_PROCESS_LENGTH = 50
+
+# Fields refreshed on existing rows when --force is used with --fetch-all
+BULK_UPDATE_FIELDS = [
+    'title', 'original_explanation', 'media_type', 'image_url', 'hd_image_url',
+    'thumbnail_url', 'copyright', 'source_url', 'is_processed', 'processing_error',
+    'updated_at',
+]
+
+# After this long an unfinished claim on a picture is considered abandoned
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Caps concurrent OpenAI calls across the --fetch-all worker threads
+_OPENAI_SLOTS = threading.BoundedSemaphore(settings.OPENAI_MAX_CONCURRENCY)
 
 
 class Command(BaseCommand):
@@ -18,7 +52,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--source',
             type=str,
-            choices=[choice[0] for choice in PictureSource.choices],
+            choices=SOURCE_CHOICES,
             default='apod',
             help='Source to fetch from (default: apod)',
         )
@@ -56,6 +90,8 @@ class Command(BaseCommand):
         download_image = options.get('download_image', False)
         process_text = options.get('process_text', True)
         fetch_all = options.get('fetch_all', False)
+        # Full tracebacks only with -v 2 or higher
+        self.verbosity = options.get('verbosity', 1)
         
         try:
             fetcher = get_fetcher(source)
@@ -66,25 +102,9 @@ class Command(BaseCommand):
                 
                 self.stdout.write(f'Found {len(all_pictures)} pictures')
                 
-                for picture_data in all_pictures:
-                    picture_date = datetime.strptime(picture_data['date'], '%Y-%m-%d').date()
-                    self.stdout.write(f'Processing {source.upper()} for {picture_date}...')
-                    
-                    picture, created = self.save_picture(source, picture_data, force)
-                    
-                    if created:
-                        self.stdout.write(self.style.SUCCESS(f'Created: {picture.title}'))
-                    else:
-                        self.stdout.write(self.style.WARNING(f'Exists: {picture.title}'))
-                    
-                    if picture.media_type == 'image':
-                        self.get_image_metadata(picture)
-                    
-                    if download_image and picture.media_type == 'image':
-                        self.download_and_store_image(picture)
-                    
-                    if process_text and (not picture.is_processed or force):
-                        self.process_text(picture, source)
+                pictures, created_dates = self.save_pictures(source, all_pictures, force)
+                
+                self.process_pictures(pictures, created_dates, source, force, download_image, process_text)
                 
                 self.stdout.write(self.style.SUCCESS(f'Successfully processed {len(all_pictures)} pictures!'))
                 return
@@ -100,7 +120,7 @@ class Command(BaseCommand):
             
             self.stdout.write(f'Fetching {source.upper()} for {picture_date}...')
             
-            picture_data = fetcher.fetch(picture_date)
+            picture_data = fetcher.fetch(picture_date, refresh=force)
             
             picture, created = self.save_picture(source, picture_data, force)
             
@@ -121,26 +141,24 @@ class Command(BaseCommand):
             
             if process_text and (not picture.is_processed or force):
                 self.stdout.write('Processing text with OpenAI...')
-                self.process_text(picture, source)
+                self.process_text(picture, source, force=force)
                 self.stdout.write(self.style.SUCCESS('Processing complete!'))
             elif picture.is_processed and not force:
                 self.stdout.write('Picture already processed. Use --force to reprocess.')
                 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
-            import traceback
-            self.stdout.write(traceback.format_exc())
+            if self.verbosity >= 2:
+                self.stdout.write(traceback.format_exc())
 
-    def save_picture(self, source, picture_data, force=False):
-        """Save picture data to database"""
-        picture_date = datetime.strptime(picture_data['date'], '%Y-%m-%d').date()
-        
+    def picture_defaults(self, picture_data):
+        """Build sanitized model field values from fetched picture data"""
         # Sanitize title and explanation to remove HTML entities
         sanitized_title = sanitize_html_entities(picture_data['title'])
         sanitized_explanation = sanitize_html_entities(picture_data['explanation'])
         sanitized_copyright = sanitize_html_entities(picture_data.get('copyright')) if picture_data.get('copyright') else None
         
-        defaults = {
+        return {
             'title': sanitized_title,
             'original_explanation': sanitized_explanation,
             'media_type': picture_data.get('media_type', 'image'),
@@ -150,17 +168,33 @@ class Command(BaseCommand):
             'copyright': sanitized_copyright,
             'source_url': picture_data.get('source_url'),
         }
+
+    def save_picture(self, source, picture_data, force=False):
+        """Save picture data to database"""
+        picture_date = date.fromisoformat(picture_data['date'])
+        defaults = self.picture_defaults(picture_data)
         
         if force:
-            picture, created = PictureOfTheDay.objects.update_or_create(
+            # Single INSERT ... ON CONFLICT DO UPDATE that also resets the
+            # processing state so the picture is reprocessed
+            created = not PictureOfTheDay.objects.filter(source=source, date=picture_date).exists()
+            picture = PictureOfTheDay(
                 source=source,
                 date=picture_date,
-                defaults=defaults
+                is_processed=False,
+                processing_error=None,
+                updated_at=timezone.now(),
+                **defaults
             )
-            if not created:
-                picture.is_processed = False
-                picture.processing_error = None
-                picture.save()
+            PictureOfTheDay.objects.bulk_create(
+                [picture],
+                update_conflicts=True,
+                unique_fields=['source', 'date'],
+                update_fields=list(defaults) + ['is_processed', 'processing_error', 'updated_at'],
+            )
+            if picture.pk is None:
+                # Backends that can't return ids from an upsert
+                picture = PictureOfTheDay.objects.get(source=source, date=picture_date)
         else:
             picture, created = PictureOfTheDay.objects.get_or_create(
                 source=source,
@@ -170,40 +204,200 @@ class Command(BaseCommand):
         
         return picture, created
 
-    def get_image_metadata(self, picture):
+    def save_pictures(self, source, all_pictures, force=False):
+        """
+        Save a batch of picture data in a fixed number of queries.
+        Returns the saved pictures ordered by date and the set of dates
+        that were newly created.
+        """
+        wanted = {
+            date.fromisoformat(picture_data['date']): picture_data
+            for picture_data in all_pictures
+        }
+        # (source, date) is unique together, so date alone keys a single source
+        existing = {
+            picture.date: picture
+            for picture in PictureOfTheDay.objects.filter(source=source, date__in=wanted)
+        }
+        
+        to_create = [
+            PictureOfTheDay(source=source, date=picture_date, **self.picture_defaults(picture_data))
+            for picture_date, picture_data in wanted.items()
+            if picture_date not in existing
+        ]
+        PictureOfTheDay.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        
+        if force and existing:
+            # bulk_update() bypasses auto_now, so stamp updated_at explicitly
+            now = timezone.now()
+            for picture_date, picture in existing.items():
+                for field, value in self.picture_defaults(wanted[picture_date]).items():
+                    setattr(picture, field, value)
+                picture.is_processed = False
+                picture.processing_error = None
+                picture.updated_at = now
+            PictureOfTheDay.objects.bulk_update(
+                existing.values(),
+                BULK_UPDATE_FIELDS,
+                batch_size=500,
+            )
+        
+        pictures = PictureOfTheDay.objects.filter(
+            source=source, date__in=wanted
+        ).order_by('date')
+        created_dates = {picture.date for picture in to_create}
+        return list(pictures), created_dates
+
+    def process_pictures(self, pictures, created_dates, source, force, download_image, process_text):
+        """
+        Run the metadata/download/text steps for a batch of pictures.
+        Each picture is handled by one worker so its saves never race;
+        output is buffered per picture and written from this thread.
+        """
+        workers = min(settings.FETCH_WORKERS, len(pictures))
+        args = (created_dates, source, force, download_image, process_text)
+        
+        if workers <= 1:
+            for picture in pictures:
+                self.stdout.write(self.process_picture(picture, *args), ending='')
+            return
+        
+        if process_text:
+            # Build the shared OpenAI client once, before the workers race for it
+            self.text_processor
+        
+        def run(picture):
+            close_old_connections()
+            try:
+                return self.process_picture(picture, *args)
+            finally:
+                # Worker threads open their own DB connections
+                connections.close_all()
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch-picture') as executor:
+            futures = [executor.submit(run, picture) for picture in pictures]
+            for future in as_completed(futures):
+                self.stdout.write(future.result(), ending='')
+
+    def process_picture(self, picture, created_dates, source, force, download_image, process_text):
+        """Process a single picture from a --fetch-all batch and return its output"""
+        buffer = StringIO()
+        out = OutputWrapper(buffer)
+        out.write(f'Processing {source.upper()} for {picture.date}...')
+        
+        if picture.date in created_dates:
+            out.write(self.style.SUCCESS(f'Created: {picture.title}'))
+        else:
+            out.write(self.style.WARNING(f'Exists: {picture.title}'))
+        
+        needs_text = process_text and (not picture.is_processed or force)
+        if needs_text and not self.claim_picture(picture):
+            out.write(self.style.WARNING('  Skipped: being processed by another run'))
+            return buffer.getvalue()
+        
+        # A failing picture is reported and the rest of the batch carries on
+        try:
+            if picture.media_type == 'image':
+                self.get_image_metadata(picture, out)
+            
+            if download_image and picture.media_type == 'image':
+                self.download_and_store_image(picture, out)
+            
+            if needs_text:
+                with _OPENAI_SLOTS:
+                    self.process_text(picture, source, out, force)
+        except Exception as e:
+            out.write(self.style.ERROR(f'Error processing {picture.date}: {str(e)}'))
+            if self.verbosity >= 2:
+                out.write(traceback.format_exc())
+            # process_text releases its own claim; a failure before it
+            # (metadata, download) would otherwise hold it until CLAIM_TIMEOUT
+            if needs_text and picture.processing_started_at is not None:
+                self.release_claim(picture)
+        
+        return buffer.getvalue()
+
+    def claim_picture(self, picture):
+        """
+        Mark an unprocessed picture as being processed by this run.
+        
+        The claim is a single conditional UPDATE, so when two --fetch-all runs
+        overlap only one of them does the download and OpenAI work for a
+        picture. Claims older than CLAIM_TIMEOUT are treated as abandoned.
+        Returns True if this run now owns the picture.
+        """
+        now = timezone.now()
+        claimed = PictureOfTheDay.objects.filter(
+            Q(processing_started_at__isnull=True) | Q(processing_started_at__lt=now - CLAIM_TIMEOUT),
+            pk=picture.pk,
+            is_processed=False,
+        ).update(processing_started_at=now)
+        if claimed:
+            picture.processing_started_at = now
+        return bool(claimed)
+
+    def release_claim(self, picture):
+        """Clear this run's claim on a picture, unless another run has since taken it over"""
+        PictureOfTheDay.objects.filter(
+            pk=picture.pk,
+            processing_started_at=picture.processing_started_at,
+        ).update(processing_started_at=None)
+        picture.processing_started_at = None
+
+    @cached_property
+    def text_processor(self):
+        """
+        One TextProcessor per command run. Its OpenAI client is thread-safe,
+        so the --fetch-all workers share its connection pool instead of
+        opening a new one for every picture.
+        """
+        return TextProcessor()
+
+    def get_image_metadata(self, picture, out=None):
         """Get image metadata (width, height, size) from full resolution URL"""
+        out = out or self.stdout
         try:
             image_processor = ImageProcessor()
             
             image_url = picture.hd_image_url or picture.image_url
             
             if not image_url:
-                self.stdout.write(self.style.WARNING('No image URL available'))
+                out.write(self.style.WARNING('No image URL available'))
                 return
             
+            if picture.image_width and picture.image_height and not picture.image_size_bytes:
+                # Only the size is missing, which a HEAD request can answer
+                size_bytes = image_processor.get_image_size(image_url)
+                if size_bytes:
+                    picture.image_size_bytes = size_bytes
+                    picture.save(update_fields=['image_size_bytes', 'updated_at'])
+                    out.write(f'  Size: {size_bytes / (1024*1024):.2f} MB')
+                    return
+            
             width, height, size_bytes = image_processor.get_image_metadata(image_url)
             
             if width and height and size_bytes:
                 picture.image_width = width
                 picture.image_height = height
                 picture.image_size_bytes = size_bytes
-                picture.save()
-                self.stdout.write(f'  Dimensions: {width}x{height}, Size: {size_bytes / (1024*1024):.2f} MB')
+                picture.save(update_fields=['image_width', 'image_height', 'image_size_bytes', 'updated_at'])
+                out.write(f'  Dimensions: {width}x{height}, Size: {size_bytes / (1024*1024):.2f} MB')
             else:
-                self.stdout.write(self.style.WARNING('  Could not retrieve image metadata'))
+                out.write(self.style.WARNING('  Could not retrieve image metadata'))
                 
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error getting image metadata: {str(e)}'))
+            out.write(self.style.ERROR(f'Error getting image metadata: {str(e)}'))
 
-    def download_and_store_image(self, picture):
+    def download_and_store_image(self, picture, out=None):
         """Download image and store locally with size information"""
+        out = out or self.stdout
         try:
             image_processor = ImageProcessor()
             
             image_url = picture.hd_image_url or picture.image_url
             
             if not image_url:
-                self.stdout.write(self.style.WARNING('No image URL available'))
+                out.write(self.style.WARNING('No image URL available'))
                 return
             
             local_path = image_processor.get_image_path(
@@ -223,30 +417,54 @@ class Command(BaseCommand):
             picture.image_width = width
             picture.image_height = height
             picture.image_size_bytes = size_bytes
-            picture.save()
+            picture.save(update_fields=['local_image_path', 'image_width', 'image_height', 'image_size_bytes', 'updated_at'])
             
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error downloading image: {str(e)}'))
+            out.write(self.style.ERROR(f'Error downloading image: {str(e)}'))
             picture.processing_error = f"Image download error: {str(e)}"
-            picture.save()
+            picture.save(update_fields=['processing_error', 'updated_at'])
             raise
 
-    def process_text(self, picture, source):
+    def process_text(self, picture, source, out=None, force=False):
         """
         Process picture explanation with OpenAI using unified function.
         Creates a 300-word summary with exactly 3 Wikipedia links.
         Used for all picture sources.
+        
+        Skips the OpenAI call when the explanation is the one the stored
+        summary was made from (unless force), or too short to summarize.
         """
+        out = out or self.stdout
+        text_hash = explanation_hash(picture.original_explanation)
+        update_fields = [
+            'simplified_explanation', 'processed_explanation', 'explanation_hash',
+            'is_processed', 'processing_error', 'processing_started_at', 'updated_at',
+        ]
+        
+        if not force and picture.processed_explanation and picture.explanation_hash == text_hash:
+            picture.is_processed = True
+            picture.processing_error = None
+            picture.processing_started_at = None
+            picture.save(update_fields=update_fields)
+            out.write('Explanation unchanged since last processing, kept existing summary ✓')
+            return
+        
+        if len(picture.original_explanation.strip()) < MIN_PROCESS_LENGTH:
+            # Nothing worth summarizing; show the original as is
+            picture.simplified_explanation = picture.original_explanation
+            picture.processed_explanation = None
+            picture.explanation_hash = text_hash
+            picture.is_processed = True
+            picture.processing_error = None
+            picture.processing_started_at = None
+            picture.save(update_fields=update_fields)
+            out.write('Explanation too short to summarize, kept as is ✓')
+            return
+        
         try:
-            text_processor = TextProcessor()
+            text_processor = self.text_processor
             
-            # Context mapping for all sources
-            context_map = {
-                'apod': 'astronomy',
-                'wikipedia': 'general',
-                'bing': 'general',
-            }
-            context = context_map.get(source, 'general')
+            context = CONTEXT_MAP.get(source, 'general')
             
             # Use unified processing function for all sources
             # This creates a 300-word summary with exactly 3 Wikipedia links
@@ -257,13 +475,17 @@ class Command(BaseCommand):
             
             # Sanitize processed text to remove HTML entities
             picture.processed_explanation = sanitize_html_entities(processed_text)
+            picture.explanation_hash = text_hash
             picture.is_processed = True
             picture.processing_error = None
-            picture.save()
+            picture.processing_started_at = None
+            picture.save(update_fields=update_fields)
             
-            self.stdout.write('Text processed: 300-word summary with 3 Wikipedia links ✓')
+            out.write('Text processed: 300-word summary with 3 Wikipedia links ✓')
             
         except Exception as e:
             picture.processing_error = str(e)
-            picture.save()
+            # Release the claim so a later run can retry
+            picture.processing_started_at = None
+            picture.save(update_fields=['processing_error', 'processing_started_at', 'updated_at'])
             raise
\ No newline at end of file
@@ -20,21 +20,15 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         sources_to_disable = options.get('disable', [])
         
+        existing = dict(SourceConfiguration.objects.values_list('source', 'is_enabled'))
+        rows = []
         created_count = 0
         updated_count = 0
         
         for source_value, source_label in PictureSource.choices:
             is_enabled = source_value not in sources_to_disable
             
-            config, created = SourceConfiguration.objects.get_or_create(
-                source=source_value,
-                defaults={
-                    'is_enabled': is_enabled,
-                    'display_name': None,  # Use default label
-                }
-            )
-            
-            if created:
+            if source_value not in existing:
                 created_count += 1
                 self.stdout.write(
                     self.style.SUCCESS(
@@ -42,18 +36,32 @@ class Command(BaseCommand):
                         f'{"Enabled" if is_enabled else "Disabled"}'
                     )
                 )
-            else:
+            elif existing[source_value] != is_enabled:
                 # Update if it was created but status changed
-                if config.is_enabled != is_enabled:
-                    config.is_enabled = is_enabled
-                    config.save()
-                    updated_count += 1
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'Updated configuration for {source_value} - '
-                            f'{"Enabled" if is_enabled else "Disabled"}'
-                        )
+                updated_count += 1
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Updated configuration for {source_value} - '
+                        f'{"Enabled" if is_enabled else "Disabled"}'
                     )
+                )
+            else:
+                continue
+            
+            rows.append(SourceConfiguration(
+                source=source_value,
+                is_enabled=is_enabled,
+                display_name=None,  # Use default label
+            ))
+        
+        # One INSERT ... ON CONFLICT for new and changed sources; display_name
+        # is only set on insert so custom names are kept
+        SourceConfiguration.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['source'],
+            update_fields=['is_enabled', 'updated_at'],
+        )
         
         self.stdout.write(
             self.style.SUCCESS(
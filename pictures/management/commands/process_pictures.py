@@ -0,0 +1,227 @@
+"""
+Management command to process picture descriptions through the OpenAI Batch API.
+
+Meant for backfills and reprocessing where results can wait: batch requests
+cost half as much as the synchronous calls fetch_picture makes and finish
+within 24 hours.
+
+Submitted pictures are claimed the same way fetch_picture claims them, and
+the claim time is kept in the batch metadata. Each request's custom_id
+carries the explanation hash it was made from (the metadata only holds a
+few short values), so a result is only stored if the text hasn't changed
+since submission.
+"""
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.db.models.functions import Length
+from django.utils import timezone
+from pictures.management.commands.fetch_picture import CLAIM_TIMEOUT, CONTEXT_MAP, MIN_PROCESS_LENGTH, SOURCE_CHOICES
+from pictures.models import PictureOfTheDay
+from pictures.processors import TextProcessor
+from pictures.utils import explanation_hash, sanitize_html_entities
+
+
+class Command(BaseCommand):
+    help = 'Process unprocessed picture descriptions with the OpenAI Batch API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            type=str,
+            choices=SOURCE_CHOICES,
+            help='Only process pictures from a specific source (optional)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help='Maximum number of pictures to submit (default: 1000)',
+        )
+        parser.add_argument(
+            '--batch-id',
+            type=str,
+            help='Collect the results of a previously submitted batch instead of submitting a new one',
+        )
+        parser.add_argument(
+            '--no-wait',
+            action='store_true',
+            help='Return right after submitting (or if the batch is still running) instead of polling until it finishes',
+        )
+
+    def handle(self, *args, **options):
+        text_processor = TextProcessor()
+        batch_id = options.get('batch_id')
+        wait = not options.get('no_wait', False)
+
+        if not batch_id:
+            now = timezone.now()
+            pictures = PictureOfTheDay.objects.filter(
+                Q(processing_started_at__isnull=True) | Q(processing_started_at__lt=now - CLAIM_TIMEOUT),
+                is_processed=False,
+            ).annotate(
+                explanation_length=Length('original_explanation')
+            ).filter(
+                explanation_length__gte=MIN_PROCESS_LENGTH
+            ).only('id', 'source', 'original_explanation').order_by('-date')
+            if options.get('source'):
+                pictures = pictures.filter(source=options['source'])
+            pictures = list(pictures[:options['limit']])
+
+            pictures = self.apply_cached(text_processor, pictures)
+            pictures = self.claim_pictures(pictures, now)
+
+            if not pictures:
+                self.stdout.write('No unprocessed pictures found.')
+                return
+
+            # The custom_id carries the hash of the text the request is made from
+            items = [
+                (
+                    f'{picture.pk}:{explanation_hash(picture.original_explanation)}',
+                    picture.original_explanation,
+                    CONTEXT_MAP.get(picture.source, 'general'),
+                )
+                for picture in pictures
+            ]
+            batch_id = text_processor.submit_description_batch(
+                items, metadata={'claimed_at': now.isoformat()}
+            )
+            self.stdout.write(self.style.SUCCESS(f'Submitted {len(pictures)} pictures as batch {batch_id}'))
+
+            if not wait:
+                self.stdout.write(f'Collect the results later with --batch-id {batch_id}')
+                return
+
+            self.stdout.write('Waiting for the batch to finish...')
+
+        try:
+            collected = text_processor.fetch_description_batch(batch_id, wait=wait)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        if collected is None:
+            self.stdout.write(f'Batch {batch_id} is still running. Try again later.')
+            return
+
+        results, metadata = collected
+        self.save_results(text_processor, results, metadata)
+
+    def apply_cached(self, text_processor, pictures):
+        """
+        Store descriptions already in the 'llm' cache without submitting them
+
+        Returns:
+            list: The pictures that still need a batch request
+        """
+        now = timezone.now()
+        cached = []
+        remaining = []
+        for picture in pictures:
+            result = text_processor.cached_description(
+                picture.original_explanation, CONTEXT_MAP.get(picture.source, 'general')
+            )
+            if result is None:
+                remaining.append(picture)
+                continue
+            picture.processed_explanation = sanitize_html_entities(result)
+            picture.explanation_hash = explanation_hash(picture.original_explanation)
+            picture.is_processed = True
+            picture.processing_error = None
+            picture.processing_started_at = None
+            # bulk_update() bypasses auto_now
+            picture.updated_at = now
+            cached.append(picture)
+
+        if cached:
+            PictureOfTheDay.objects.bulk_update(
+                cached,
+                ['processed_explanation', 'explanation_hash', 'is_processed', 'processing_error',
+                 'processing_started_at', 'updated_at'],
+                batch_size=500,
+            )
+            self.stdout.write(f'Stored {len(cached)} cached descriptions')
+        return remaining
+
+    def claim_pictures(self, pictures, now):
+        """
+        Claim pictures for the batch with one conditional UPDATE, like
+        fetch_picture's claim_picture, so overlapping runs don't process them
+        too. Claims older than CLAIM_TIMEOUT are treated as abandoned.
+
+        Returns:
+            list: The pictures this run now owns
+        """
+        if not pictures:
+            return []
+        PictureOfTheDay.objects.filter(
+            Q(processing_started_at__isnull=True) | Q(processing_started_at__lt=now - CLAIM_TIMEOUT),
+            pk__in=[picture.pk for picture in pictures],
+            is_processed=False,
+        ).update(processing_started_at=now)
+        claimed = set(PictureOfTheDay.objects.filter(
+            pk__in=[picture.pk for picture in pictures],
+            processing_started_at=now,
+        ).values_list('pk', flat=True))
+        return [picture for picture in pictures if picture.pk in claimed]
+
+    def save_results(self, text_processor, results, metadata):
+        """
+        Store batch results on their pictures with one bulk_update
+
+        Pictures processed or claimed by another run in the meantime are
+        left alone. A result whose request was made from an explanation
+        that has since changed is dropped and the claim released, so the
+        next run submits the current text.
+        """
+        claimed_at = metadata.get('claimed_at')
+        claimed_at = datetime.fromisoformat(claimed_at) if claimed_at else None
+        submitted = {}
+        for custom_id, result in results.items():
+            pk, _, text_hash = custom_id.partition(':')
+            submitted[int(pk)] = (text_hash, result)
+
+        pictures = PictureOfTheDay.objects.in_bulk(submitted)
+        now = timezone.now()
+        processed_count = 0
+        failed_count = 0
+        stale_count = 0
+        updated = []
+
+        for pk, picture in pictures.items():
+            text_hash, (processed_text, error) = submitted[pk]
+            claimed_elsewhere = picture.processing_started_at not in (None, claimed_at)
+            if picture.is_processed or claimed_elsewhere:
+                continue
+            current_hash = explanation_hash(picture.original_explanation)
+            if text_hash != current_hash:
+                # Edited after submission; leave it for the next run
+                stale_count += 1
+            elif processed_text:
+                text_processor.cache_description(
+                    picture.original_explanation, CONTEXT_MAP.get(picture.source, 'general'), processed_text
+                )
+                picture.processed_explanation = sanitize_html_entities(processed_text)
+                picture.explanation_hash = current_hash
+                picture.is_processed = True
+                picture.processing_error = None
+                processed_count += 1
+            else:
+                picture.processing_error = error or 'Empty batch result'
+                failed_count += 1
+            picture.processing_started_at = None
+            # bulk_update() bypasses auto_now
+            picture.updated_at = now
+            updated.append(picture)
+
+        PictureOfTheDay.objects.bulk_update(
+            updated,
+            ['processed_explanation', 'explanation_hash', 'is_processed', 'processing_error',
+             'processing_started_at', 'updated_at'],
+            batch_size=500,
+        )
+
+        message = f'Processed {processed_count} pictures, {failed_count} failed'
+        if stale_count:
+            message += f', {stale_count} skipped because their explanation changed'
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-15 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictures', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='pictureoftheday',
+            name='pictures_pi_date_3bc70f_idx',
+        ),
+        migrations.AlterField(
+            model_name='pictureoftheday',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='pictureoftheday',
+            name='source',
+            field=models.CharField(choices=[('apod', 'Astronomy Picture of the Day (NASA)'), ('wikipedia', 'Wikipedia Picture of the Day'), ('bing', 'Bing Picture of the Day')], help_text='Source of the picture', max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='pictureoftheday',
+            index=models.Index(fields=['-date'], name='pictures_pi_date_5bf6d9_idx'),
+        ),
+    ]
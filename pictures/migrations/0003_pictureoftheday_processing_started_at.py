@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictures', '0002_picture_index_cleanup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictureoftheday',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='When a fetch run claimed this picture for processing', null=True),
+        ),
+    ]
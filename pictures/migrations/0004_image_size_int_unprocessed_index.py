@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-15 23:41
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictures', '0003_pictureoftheday_processing_started_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pictureoftheday',
+            name='image_size_bytes',
+            field=models.PositiveIntegerField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddIndex(
+            model_name='pictureoftheday',
+            index=models.Index(condition=models.Q(('is_processed', False)), fields=['date'], name='unprocessed_by_date'),
+        ),
+    ]
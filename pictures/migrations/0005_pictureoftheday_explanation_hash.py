@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-16 00:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictures', '0004_image_size_int_unprocessed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictureoftheday',
+            name='explanation_hash',
+            field=models.CharField(blank=True, help_text='Hash of the original explanation the processed text was made from', max_length=16, null=True),
+        ),
+    ]
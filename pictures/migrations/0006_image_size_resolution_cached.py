@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-16 00:41
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Concat, Round
+
+
+def populate_cached_image_fields(apps, schema_editor):
+    PictureOfTheDay = apps.get_model('pictures', 'PictureOfTheDay')
+    PictureOfTheDay.objects.filter(image_size_bytes__gt=0).update(
+        image_size_mb_cached=Round(F('image_size_bytes') / 1048576.0, 2)
+    )
+    PictureOfTheDay.objects.filter(image_width__gt=0, image_height__gt=0).update(
+        image_resolution_cached=Concat(
+            Cast('image_width', models.CharField()),
+            Value('x'),
+            Cast('image_height', models.CharField()),
+            output_field=models.CharField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictures', '0005_pictureoftheday_explanation_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictureoftheday',
+            name='image_resolution_cached',
+            field=models.CharField(blank=True, editable=False, max_length=23, null=True),
+        ),
+        migrations.AddField(
+            model_name='pictureoftheday',
+            name='image_size_mb_cached',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_cached_image_fields, migrations.RunPython.noop),
+    ]
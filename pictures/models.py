@@ -1,5 +1,8 @@
 from django.db import models
+from django.core.cache import cache
 from django.core.validators import MinValueValidator
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from .utils import sanitize_html_entities
 
@@ -11,6 +14,32 @@ class PictureSource(models.TextChoices):
     BING = 'bing', 'Bing Picture of the Day'
 
 
+# Cache entry holding {source: is_enabled} for all source configurations. The
+# default cache is per process: a write clears it in the process that made
+# it, and other workers see the change once their entry expires.
+SOURCE_CONFIG_CACHE_KEY = 'sourceconfig:enabled'
+SOURCE_CONFIG_CACHE_TIMEOUT = 60
+
+
+class SourceConfigurationQuerySet(models.QuerySet):
+    """QuerySet that drops the cached source states on bulk writes, which skip signals"""
+    
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        SourceConfiguration.clear_cache()
+        return rows
+    
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        SourceConfiguration.clear_cache()
+        return objs
+    
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        SourceConfiguration.clear_cache()
+        return rows
+
+
 class SourceConfiguration(models.Model):
     """Configuration for picture sources - enables/disables sources dynamically"""
     
@@ -41,6 +70,8 @@ class SourceConfiguration(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = SourceConfigurationQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Source Configuration'
         verbose_name_plural = 'Source Configurations'
@@ -55,20 +86,49 @@ class SourceConfiguration(models.Model):
         """Return display name or default label"""
         return self.display_name or self.get_source_display()
     
+    @classmethod
+    def source_states(cls):
+        """Get {source: is_enabled} for all configured sources, cached until a configuration changes"""
+        states = cache.get(SOURCE_CONFIG_CACHE_KEY)
+        if states is None:
+            states = dict(cls.objects.values_list('source', 'is_enabled'))
+            cache.set(SOURCE_CONFIG_CACHE_KEY, states, SOURCE_CONFIG_CACHE_TIMEOUT)
+        return states
+    
+    @classmethod
+    def clear_cache(cls):
+        """Drop the cached source states"""
+        cache.delete(SOURCE_CONFIG_CACHE_KEY)
+    
     @classmethod
     def get_enabled_sources(cls):
         """Get list of enabled source values"""
-        return list(cls.objects.filter(is_enabled=True).values_list('source', flat=True))
+        return sorted(enabled_sources())
     
     @classmethod
     def is_source_enabled(cls, source):
         """Check if a specific source is enabled"""
-        try:
-            config = cls.objects.get(source=source)
-            return config.is_enabled
-        except cls.DoesNotExist:
-            # If no configuration exists, default to enabled for backward compatibility
-            return True
+        # If no configuration exists, default to enabled for backward compatibility
+        return cls.source_states().get(source, True)
+
+
+def enabled_sources():
+    """
+    Get the enabled source values as a frozenset for membership checks.
+    Read from the cached source states, so no query in the steady state.
+    """
+    return frozenset(source for source, enabled in SourceConfiguration.source_states().items() if enabled)
+
+
+def disabled_sources():
+    """Get the explicitly disabled source values as a frozenset"""
+    return frozenset(source for source, enabled in SourceConfiguration.source_states().items() if not enabled)
+
+
+@receiver([post_save, post_delete], sender=SourceConfiguration)
+def clear_source_configuration_cache(sender, **kwargs):
+    """Invalidate the cached source states whenever a configuration changes"""
+    SourceConfiguration.clear_cache()
 
 
 class PictureOfTheDay(models.Model):
@@ -78,18 +138,22 @@ class PictureOfTheDay(models.Model):
     source = models.CharField(
         max_length=50,
         choices=PictureSource.choices,
-        db_index=True,
         help_text="Source of the picture"
     )
-    date = models.DateField(db_index=True)
+    date = models.DateField()
     
-    # Unique constraint: one picture per source per date
+    # Unique constraint: one picture per source per date. Its index also
+    # serves source-only and source+date lookups, so neither column gets
+    # its own index.
     class Meta:
         unique_together = [['source', 'date']]
         ordering = ['-date', 'source']
         indexes = [
-            models.Index(fields=['-date', 'source']),
+            models.Index(fields=['-date']),
             models.Index(fields=['source', 'is_processed']),
+            # Covers only the unprocessed backlog, so scanning it stays cheap
+            # as processed pictures accumulate
+            models.Index(fields=['date'], condition=models.Q(is_processed=False), name='unprocessed_by_date'),
         ]
         verbose_name = 'Picture of the Day'
         verbose_name_plural = 'Pictures of the Day'
@@ -108,7 +172,12 @@ class PictureOfTheDay(models.Model):
     local_image_path = models.CharField(max_length=500, blank=True, null=True)
     image_width = models.PositiveIntegerField(blank=True, null=True, validators=[MinValueValidator(1)])
     image_height = models.PositiveIntegerField(blank=True, null=True, validators=[MinValueValidator(1)])
-    image_size_bytes = models.BigIntegerField(blank=True, null=True, validators=[MinValueValidator(0)])
+    # 4-byte column: web images stay well below its 2 GB limit
+    image_size_bytes = models.PositiveIntegerField(blank=True, null=True, validators=[MinValueValidator(0)])
+    # image_size_mb and image_resolution, stored by save() so list responses
+    # don't compute them per row
+    image_size_mb_cached = models.FloatField(blank=True, null=True, editable=False)
+    image_resolution_cached = models.CharField(max_length=23, blank=True, null=True, editable=False)
     
     # Processed content
     simplified_explanation = models.TextField(blank=True, null=True)
@@ -117,6 +186,12 @@ class PictureOfTheDay(models.Model):
         null=True,
         help_text="Explanation with Wikipedia links embedded"
     )
+    explanation_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        null=True,
+        help_text="Hash of the original explanation the processed text was made from"
+    )
     
     # Metadata
     copyright = models.CharField(max_length=255, blank=True, null=True)
@@ -125,6 +200,12 @@ class PictureOfTheDay(models.Model):
     # Processing status
     is_processed = models.BooleanField(default=False)
     processing_error = models.TextField(blank=True, null=True)
+    processing_started_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        db_index=True,
+        help_text="When a fetch run claimed this picture for processing"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -162,7 +243,7 @@ class PictureOfTheDay(models.Model):
         return None
     
     def save(self, *args, **kwargs):
-        """Override save to sanitize HTML entities in text fields"""
+        """Override save to sanitize HTML entities and store the derived image fields"""
         # Sanitize title and all explanation fields
         if self.title:
             self.title = sanitize_html_entities(self.title)
@@ -175,5 +256,16 @@ class PictureOfTheDay(models.Model):
         if self.copyright:
             self.copyright = sanitize_html_entities(self.copyright)
         
+        self.image_size_mb_cached = self.image_size_mb
+        self.image_resolution_cached = self.image_resolution
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'image_size_bytes' in update_fields:
+                update_fields.add('image_size_mb_cached')
+            if update_fields & {'image_width', 'image_height'}:
+                update_fields.add('image_resolution_cached')
+            kwargs['update_fields'] = update_fields
+        
         super().save(*args, **kwargs)
 
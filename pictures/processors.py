@@ -1,70 +1,199 @@
 """
 Processing utilities for Picture of the Day
 """
+import hashlib
+import json
 import re
 import os
+import struct
+import time
 import requests
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from io import BytesIO
 from PIL import Image
 from django.conf import settings
-from openai import OpenAI
+from django.core.cache import cache, caches
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Patterns used to clean up and validate OpenAI output
+_RE_FENCE_OPEN = re.compile(r'^```html?\n')
+_RE_FENCE_CLOSE = re.compile(r'\n```$')
+_RE_WIKI_LINK = re.compile(
+    r'<a\s+href=["\']https?://en\.wikipedia\.org/wiki/[^"\']+["\'][^>]*>.*?</a>',
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_HTML_TAG = re.compile(r'<[^>]+>')
+_RE_MAX_AGE = re.compile(r'max-age=(\d+)')
+_RE_NO_CACHE = re.compile(r'\bno-(?:store|cache)\b', re.IGNORECASE)
+
+# JPEG start-of-frame markers, which carry the image dimensions
+_JPEG_SOF_MARKERS = frozenset({
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+})
+
+# Wikipedia and some sites require User-Agent header
+USER_AGENT = 'PictureOfTheDay/1.0 (https://github.com/orsenthil/picture)'
+
+
+# Longest wait in seconds a Retry-After header can impose before a retry
+RETRY_AFTER_MAX = 60
+
+
+class _CappedRetry(Retry):
+    """Retry that waits at most RETRY_AFTER_MAX seconds for a Retry-After header"""
+    
+    def parse_retry_after(self, retry_after):
+        return min(super().parse_retry_after(retry_after), RETRY_AFTER_MAX)
+
+
+def _build_session() -> requests.Session:
+    """
+    Build the HTTP session shared by all image requests
+    
+    Sized for the fetch_picture --fetch-all worker pool so concurrent
+    metadata and download calls to the same CDN reuse connections.
+    Connection errors, 429s and 5xx responses are retried with jittered
+    exponential backoff (honouring Retry-After up to RETRY_AFTER_MAX) before
+    a caller sees a failure, since a failed picture is only retried on the
+    next run.
+    """
+    session = requests.Session()
+    retry = _CappedRetry(
+        total=5,
+        backoff_factor=1,
+        backoff_max=30,
+        backoff_jitter=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT})
+    return session
+
+
+_SESSION = _build_session()
+
+
+@lru_cache(maxsize=1024)
+def _ensure_dir(path):
+    """
+    Create a directory if needed, once per process
+    
+    Image paths are laid out by source/year/month, so a backfill saves many
+    images into the same few directories. Nothing removes them while the
+    process runs.
+    """
+    os.makedirs(path, exist_ok=True)
+
+
+# Request timeouts in seconds
+METADATA_TIMEOUT = 60
+DOWNLOAD_TIMEOUT = 30
+HEAD_TIMEOUT = 10
+# Bytes read per iteration when streaming image downloads to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Leading bytes fetched to read image dimensions from the file header,
+# parsed as they arrive in chunks of METADATA_CHUNK_SIZE
+METADATA_PREFIX_BYTES = 64 * 1024
+METADATA_CHUNK_SIZE = 8 * 1024
+_METADATA_RANGE_HEADERS = {'Range': f'bytes=0-{METADATA_PREFIX_BYTES - 1}'}
+# Seconds image metadata stays cached when the response declares no lifetime
+METADATA_CACHE_TIMEOUT = 24 * 60 * 60
+# Part of the process_picture_description cache key; bump it whenever the
+# prompt or model changes so stale descriptions aren't served
+DESCRIPTION_CACHE_VERSION = 2
+# Longest wait in seconds between status checks of an OpenAI batch
+BATCH_MAX_POLL_INTERVAL = 300
 
 
 class ImageProcessor:
     """Handles image downloading, storage, and size calculation"""
     
     @staticmethod
-    def get_image_metadata(url):
+    def get_image_metadata(url, session=None):
         """
         Get image metadata (width, height, size) from full resolution image URL
         
-        Downloads the image to get dimensions, but doesn't save it.
-        Uses Content-Length header for size if available, otherwise uses downloaded size.
+        Requests at most the first METADATA_PREFIX_BYTES of the image with a
+        Range header and parses the header as it streams in, closing the
+        connection as soon as the dimensions are known. The total size comes
+        from Content-Range (or Content-Length if the range is ignored). Falls
+        back to the whole image only when the header isn't within the prefix
+        or the size can't be determined otherwise.
+        
+        Args:
+            url: Image URL
+            session: Optional requests session; defaults to the shared pool
+        
+        Successful results are cached by URL for as long as the response's
+        Cache-Control max-age or Expires header allows, or
+        METADATA_CACHE_TIMEOUT if it declares neither. Responses marked
+        no-store, no-cache or max-age=0 aren't cached.
         
         Returns:
             tuple: (width: int, height: int, size_bytes: int) or (None, None, None) on error
         """
+        cache_key = 'imgmeta:' + hashlib.sha1(url.encode()).hexdigest()
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        session = session or _SESSION
         try:
-            # Wikipedia and some sites require User-Agent header
-            headers = {
-                'User-Agent': 'PictureOfTheDay/1.0 (https://github.com/orsenthil/picture)'
-            }
-            # Download image to get dimensions (we need the image data for PIL)
-            response = requests.get(url, headers=headers, timeout=60, stream=True)  # Increased timeout for large images
-            response.raise_for_status()
-            
-            # Get size from Content-Length header if available
-            if 'Content-Length' in response.headers:
-                size_bytes = int(response.headers['Content-Length'])
-            else:
-                size_bytes = None
-            
-            # Download image data to get dimensions
-            image_data = response.content
-            
-            # If we didn't get size from header, use downloaded size
-            if size_bytes is None:
-                size_bytes = len(image_data)
-            
-            # Get image dimensions using PIL
-            try:
-                img = Image.open(BytesIO(image_data))
-                width, height = img.size
-                # Verify image is valid
-                img.verify()
-            except Exception as img_error:
-                # If PIL can't read it, try to get dimensions from EXIF or other methods
-                # For now, return None for dimensions but keep size if we have it
+            with session.get(url, headers=_METADATA_RANGE_HEADERS, timeout=METADATA_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                cache_timeout = ImageProcessor._cache_timeout(response.headers)
+                partial = response.status_code == 206
+                
+                if partial:
+                    # Content-Range: bytes 0-65535/1234567
+                    total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                    size_bytes = int(total) if total.isdigit() else None
+                else:
+                    size_bytes = int(response.headers['Content-Length']) if 'Content-Length' in response.headers else None
+                
+                chunks = response.iter_content(chunk_size=METADATA_CHUNK_SIZE)
+                image_data = bytearray()
                 width, height = None, None
-                # If we can't get dimensions, we still want to return size if available
-                if size_bytes:
-                    # Try one more time with a fresh image object (verify() consumes the data)
-                    try:
-                        img = Image.open(BytesIO(image_data))
-                        width, height = img.size
-                    except:
-                        pass
+                exhausted = True
+                for chunk in chunks:
+                    image_data += chunk
+                    width, height = ImageProcessor._read_dimensions(image_data)
+                    if width is not None or len(image_data) >= METADATA_PREFIX_BYTES:
+                        exhausted = False
+                        break
+                
+                # The whole image is in hand if the stream ended and it wasn't
+                # cut short by the range
+                whole = exhausted and (not partial or (size_bytes is not None and len(image_data) >= size_bytes))
+                
+                if not whole and (width is None or size_bytes is None):
+                    # Dimensions aren't in the prefix (e.g. large EXIF block) or the
+                    # size is unknown, so the whole image is needed
+                    if partial:
+                        image_data = bytearray()
+                        with session.get(url, timeout=METADATA_TIMEOUT, stream=True) as full_response:
+                            full_response.raise_for_status()
+                            chunks = full_response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+                            for chunk in chunks:
+                                image_data += chunk
+                    else:
+                        # Append in place rather than joining a second copy
+                        for chunk in chunks:
+                            image_data += chunk
+                    if width is None:
+                        width, height = ImageProcessor._read_dimensions(image_data)
+                
+                if size_bytes is None:
+                    size_bytes = len(image_data)
             
+            if width is not None and cache_timeout:
+                cache.set(cache_key, (width, height, size_bytes), timeout=cache_timeout)
             return width, height, size_bytes
             
         except requests.exceptions.RequestException as e:
@@ -75,32 +204,176 @@ class ImageProcessor:
             return None, None, None
     
     @staticmethod
-    def download_image(url, save_path=None):
+    def get_image_size(url, session=None):
         """
-        Download image from URL and optionally save to local path
+        Get the size of an image from the Content-Length of a HEAD request,
+        for when the dimensions are already known and the body isn't needed
         
         Returns:
-            tuple: (image_data: bytes, width: int, height: int, size_bytes: int)
+            int: Size in bytes, or None if the server doesn't report it
         """
-        response = requests.get(url, timeout=30, stream=True)
-        response.raise_for_status()
+        session = session or _SESSION
+        try:
+            response = session.head(url, allow_redirects=True, timeout=HEAD_TIMEOUT)
+            response.raise_for_status()
+            content_length = response.headers.get('Content-Length', '')
+            return int(content_length) if content_length.isdigit() else None
+        except requests.exceptions.RequestException as e:
+            return None
+    
+    @staticmethod
+    def _cache_timeout(headers):
+        """
+        Seconds a response may be cached for, from Cache-Control max-age or
+        Expires; METADATA_CACHE_TIMEOUT when neither gives a lifetime in the
+        future. 0 when Cache-Control says not to cache (no-store, no-cache or
+        max-age=0).
+        """
+        cache_control = headers.get('Cache-Control', '')
+        if _RE_NO_CACHE.search(cache_control):
+            return 0
+        match = _RE_MAX_AGE.search(cache_control)
+        if match:
+            return int(match.group(1))
         
-        image_data = response.content
-        size_bytes = len(image_data)
+        expires = headers.get('Expires')
+        if expires:
+            try:
+                seconds = (parsedate_to_datetime(expires) - timezone.now()).total_seconds()
+            except (TypeError, ValueError):
+                seconds = 0
+            if seconds > 0:
+                return int(seconds)
         
-        # Get image dimensions
+        return METADATA_CACHE_TIMEOUT
+    
+    @staticmethod
+    def _read_dimensions(image_data):
+        """Read (width, height) from image bytes; only the header needs to be present"""
+        dimensions = ImageProcessor._peek_dimensions(image_data)
+        if dimensions is not None:
+            return dimensions
+        # Unknown format or a header the parser doesn't handle
         try:
-            img = Image.open(BytesIO(image_data))
-            width, height = img.size
-        except Exception as e:
-            # If we can't read the image, return None for dimensions
-            width, height = None, None
+            with BytesIO(image_data) as buffer, Image.open(buffer) as img:
+                return img.size
+        except Exception:
+            return None, None
+    
+    @staticmethod
+    def _peek_dimensions(data):
+        """
+        Read (width, height) straight from a PNG, GIF, WebP or JPEG header
         
-        # Save to local path if provided
-        if save_path:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            with open(save_path, 'wb') as f:
-                f.write(image_data)
+        Avoids PIL's decoder setup for the formats the sources serve.
+        
+        Returns:
+            tuple: (width, height), or None if the format isn't recognised or
+            the header isn't complete yet
+        """
+        try:
+            if data[:8] == b'\x89PNG\r\n\x1a\n':
+                if data[12:16] == b'IHDR':
+                    return struct.unpack('>II', data[16:24])
+                return None
+            
+            if data[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', data[6:10])
+            
+            if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+                if len(data) < 30:
+                    return None
+                chunk = data[12:16]
+                if chunk == b'VP8 ':
+                    width, height = struct.unpack('<HH', data[26:30])
+                    return width & 0x3FFF, height & 0x3FFF
+                if chunk == b'VP8L':
+                    bits = struct.unpack('<I', data[21:25])[0]
+                    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                if chunk == b'VP8X':
+                    return (
+                        int.from_bytes(data[24:27], 'little') + 1,
+                        int.from_bytes(data[27:30], 'little') + 1,
+                    )
+                return None
+            
+            if data[:2] == b'\xff\xd8':
+                # Walk the JPEG segments up to the first start-of-frame marker
+                offset = 2
+                while offset + 4 <= len(data):
+                    if data[offset] != 0xFF:
+                        return None
+                    marker = data[offset + 1]
+                    if marker == 0xFF:
+                        # Fill byte
+                        offset += 1
+                        continue
+                    if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                        # Standalone marker without a length
+                        offset += 2
+                        continue
+                    if marker in _JPEG_SOF_MARKERS:
+                        if offset + 9 > len(data):
+                            return None
+                        height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                        return width, height
+                    offset += 2 + struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        except struct.error:
+            pass
+        return None
+    
+    @staticmethod
+    def download_image(url, save_path=None, session=None):
+        """
+        Download image from URL and optionally save to local path
+        
+        When save_path is given the response is streamed straight to disk in
+        chunks and image_data is None, so large HD images are never held in
+        memory. Without save_path the image is returned as bytes.
+        
+        Returns:
+            tuple: (image_data: bytes or None, width: int, height: int, size_bytes: int)
+        """
+        session = session or _SESSION
+        with session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            
+            if save_path:
+                _ensure_dir(os.path.dirname(save_path))
+                # Write to a temporary name so an interrupted download never
+                # leaves a truncated file at save_path
+                partial_path = f"{save_path}.part"
+                size_bytes = 0
+                # Keep the leading bytes so dimensions can be read from the header
+                header = bytearray()
+                try:
+                    with open(partial_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            size_bytes += len(chunk)
+                            if len(header) < METADATA_PREFIX_BYTES:
+                                header += chunk[:METADATA_PREFIX_BYTES - len(header)]
+                    os.replace(partial_path, save_path)
+                except Exception:
+                    if os.path.exists(partial_path):
+                        os.remove(partial_path)
+                    raise
+                image_data = None
+            else:
+                image_data = response.content
+                size_bytes = len(image_data)
+                return image_data, *ImageProcessor._read_dimensions(image_data), size_bytes
+        
+        # Get image dimensions; Image.open only reads the header, not the pixels
+        dimensions = ImageProcessor._peek_dimensions(header)
+        if dimensions is None:
+            try:
+                with Image.open(save_path) as img:
+                    dimensions = img.size
+            except Exception as e:
+                # If we can't read the image, return None for dimensions
+                dimensions = None, None
+        width, height = dimensions
         
         return image_data, width, height, size_bytes
     
@@ -123,11 +396,50 @@ class ImageProcessor:
         return os.path.join('pictures', source, date.strftime('%Y'), date.strftime('%m'), filename)
 
 
+# Context-specific guidance for selecting high-value terms
+_CONTEXT_GUIDANCE = {
+    'astronomy': """Focus on the most significant astronomical concepts, objects, or phenomena mentioned. 
+Prioritize: major celestial objects, important scientific discoveries, key astronomical phenomena, or notable space missions.""",
+    'general': """Focus on the most significant people, places, events, or concepts mentioned.
+Prioritize: notable historical figures, important locations, significant events, or key scientific/cultural concepts."""
+}
+
+# process_picture_description instructions. They are identical for every
+# call, so OpenAI's prompt caching bills repeat calls at the cached-input
+# rate; the per-call user message only carries the context and the text.
+_SYSTEM_PROMPT = """You are an expert at creating concise, informative summaries and identifying the most valuable terms for Wikipedia linking.
+
+Create a highly representative summary of the picture description you are given. The summary should:
+1. Be concise and informative (maximum 300 words)
+2. Capture the essential information and key points about the picture
+3. Be accessible to a general audience while maintaining accuracy
+4. Include exactly 3 high-value Wikipedia links to the most important terms/concepts
+
+Select the 3 most important terms/concepts that would benefit readers most from Wikipedia links.
+These should be the highest-value terms that add significant context or understanding.
+
+""" + "\n\n".join(
+    f"For context '{context}': {guidance}" for context, guidance in _CONTEXT_GUIDANCE.items()
+) + """
+
+Format the Wikipedia links as HTML anchor tags:
+<a href="https://en.wikipedia.org/wiki/Article_Name" target="_blank">term</a>
+
+Return ONLY the processed summary text with exactly 3 Wikipedia links embedded, no preamble or explanation."""
+
+
 class TextProcessor:
     """Handles text processing with OpenAI"""
     
     def __init__(self, api_key=None):
-        self.client = OpenAI(api_key=api_key or settings.OPENAI_API_KEY)
+        # openai takes about half a second to import, so only pay for it
+        # when text is actually processed, not on every import of this module
+        from openai import OpenAI
+        
+        self.client = OpenAI(
+            api_key=api_key or settings.OPENAI_API_KEY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+        )
     
     def process_picture_description(self, original_text, context="general"):
         """
@@ -141,59 +453,164 @@ class TextProcessor:
             original_text: Original description text from the picture source
             context: Context for processing (e.g., 'astronomy', 'general')
         
+        Results are kept in the persistent 'llm' cache by context and text,
+        so reruns and sources sharing a description don't pay for the same
+        completion twice.
+        
         Returns:
             str: Processed text with summary (max 300 words) and exactly 3 Wikipedia links
         """
-        # Context-specific guidance for selecting high-value terms
-        context_guidance = {
-            'astronomy': """Focus on the most significant astronomical concepts, objects, or phenomena mentioned. 
-Prioritize: major celestial objects, important scientific discoveries, key astronomical phenomena, or notable space missions.""",
-            'general': """Focus on the most significant people, places, events, or concepts mentioned.
-Prioritize: notable historical figures, important locations, significant events, or key scientific/cultural concepts."""
-        }
-        
-        guidance = context_guidance.get(context, context_guidance['general'])
+        result = self.cached_description(original_text, context)
+        if result is not None:
+            return result
         
-        prompt = f"""Create a highly representative summary of the following picture description. The summary should:
-1. Be concise and informative (maximum 300 words)
-2. Capture the essential information and key points about the picture
-3. Be accessible to a general audience while maintaining accuracy
-4. Include exactly 3 high-value Wikipedia links to the most important terms/concepts
-
-Select the 3 most important terms/concepts that would benefit readers most from Wikipedia links.
-These should be the highest-value terms that add significant context or understanding.
-
-{guidance}
-
-Format the Wikipedia links as HTML anchor tags:
-<a href="https://en.wikipedia.org/wiki/Article_Name" target="_blank">term</a>
-
-Original description:
-{original_text}
-
-Return ONLY the processed summary text with exactly 3 Wikipedia links embedded, no preamble or explanation:"""
-
         response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an expert at creating concise, informative summaries and identifying the most valuable terms for Wikipedia linking."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=800  # Enough for ~300 words plus HTML links
+            **self._description_request(original_text, context)
         )
         
-        result = response.choices[0].message.content.strip()
+        result = self._finish_description(response.choices[0].message.content)
+        self.cache_description(original_text, context, result)
+        return result
+    
+    @staticmethod
+    def _description_cache_key(original_text, context):
+        """Key of a process_picture_description result in the 'llm' cache"""
+        text_hash = hashlib.sha256(f'{context}\x00{original_text}'.encode()).hexdigest()
+        return f'llm:v{DESCRIPTION_CACHE_VERSION}:{text_hash}'
+    
+    def cached_description(self, original_text, context="general"):
+        """Return the cached process_picture_description result, or None"""
+        return caches['llm'].get(self._description_cache_key(original_text, context))
+    
+    def cache_description(self, original_text, context, result):
+        """Keep a description result, from either the synchronous or the Batch API, in the 'llm' cache"""
+        if result:
+            caches['llm'].set(self._description_cache_key(original_text, context), result)
+    
+    def _description_request(self, original_text, context="general"):
+        """Build the chat completion parameters for process_picture_description"""
+        if context not in _CONTEXT_GUIDANCE:
+            context = 'general'
+        
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": f"Context: {context}\n\nDescription:\n{original_text}"}
+            ],
+            "temperature": 0.7,
+            "max_tokens": 800,  # Enough for ~300 words plus HTML links
+        }
+    
+    def _finish_description(self, result):
+        """Clean up and validate a raw process_picture_description completion"""
+        result = result.strip()
         
         # Clean up any markdown code blocks if present
-        result = re.sub(r'^```html?\n', '', result)
-        result = re.sub(r'\n```$', '', result)
+        result = _RE_FENCE_OPEN.sub('', result)
+        result = _RE_FENCE_CLOSE.sub('', result)
         
         # Validate and fix if needed
         result = self._validate_and_fix_processed_text(result)
         
         return result
     
+    def submit_description_batch(self, items, metadata=None):
+        """
+        Submit process_picture_description work to the OpenAI Batch API.
+        
+        Batch requests cost half as much as synchronous ones and complete
+        within 24 hours, which suits backfills that don't need results now.
+        
+        Args:
+            items: Iterable of (custom_id, original_text, context) tuples
+            metadata: Optional dict of strings stored on the batch and
+                returned by fetch_description_batch
+        
+        Returns:
+            str: Batch ID to pass to fetch_description_batch
+        """
+        lines = []
+        for custom_id, original_text, context in items:
+            lines.append(json.dumps({
+                "custom_id": str(custom_id),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._description_request(original_text, context),
+            }))
+        
+        batch_file = self.client.files.create(
+            file=("descriptions.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata=metadata,
+        )
+        return batch.id
+    
+    def fetch_description_batch(self, batch_id, wait=True, max_poll_interval=BATCH_MAX_POLL_INTERVAL):
+        """
+        Collect the results of a submit_description_batch batch.
+        
+        Args:
+            batch_id: ID returned by submit_description_batch
+            wait: Poll with exponential backoff until the batch finishes;
+                otherwise return None if it is still running
+            max_poll_interval: Upper bound in seconds between polls
+        
+        Returns:
+            tuple: ({custom_id: (processed_text or None, error or None)},
+            metadata) once the batch has finished, where metadata is the dict
+            given to submit_description_batch, or None if it is still running
+            and wait is False
+        
+        Raises:
+            RuntimeError: If the batch failed, expired or was cancelled
+        """
+        interval = 5
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status == "completed":
+                break
+            if batch.status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} {batch.status}")
+            if not wait:
+                return None
+            time.sleep(interval)
+            interval = min(interval * 2, max_poll_interval)
+        
+        results = {}
+        if batch.output_file_id:
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    error = record.get("error") or response.get("body", {}).get("error")
+                    results[record["custom_id"]] = (None, self._batch_error_message(error))
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[record["custom_id"]] = (self._finish_description(content), None)
+        if batch.error_file_id:
+            # Requests rejected before running only appear in the error file
+            for line in self.client.files.content(batch.error_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                results.setdefault(record["custom_id"], (None, self._batch_error_message(record.get("error"))))
+        return results, dict(batch.metadata or {})
+    
+    @staticmethod
+    def _batch_error_message(error):
+        """Pull the message out of a batch error object"""
+        if isinstance(error, dict):
+            return error.get("message") or str(error)
+        return str(error)
+    
     def _validate_and_fix_processed_text(self, text):
         """
         Validate processed text meets requirements:
@@ -205,71 +622,55 @@ Return ONLY the processed summary text with exactly 3 Wikipedia links embedded,
         if not text:
             return text
         
-        # Count Wikipedia links first (before any truncation)
-        link_pattern = r'<a\s+href=["\']https?://en\.wikipedia\.org/wiki/[^"\']+["\'][^>]*>.*?</a>'
-        all_links = re.findall(link_pattern, text, re.IGNORECASE | re.DOTALL)
-        link_count = len(all_links)
+        # Find Wikipedia links first (before any truncation)
+        link_matches = list(_RE_WIKI_LINK.finditer(text))
+        link_count = len(link_matches)
         
         # Count words (excluding HTML tags for accurate count)
-        text_for_word_count = re.sub(r'<[^>]+>', '', text)  # Remove HTML tags for word counting
-        words = text_for_word_count.split()
+        words = _RE_HTML_TAG.sub('', text).split()
         word_count = len(words)
         
+        # Common case: nothing to fix
+        if word_count <= 300 and link_count == 3:
+            return text
+        
         # If word count exceeds 300, truncate carefully to preserve links
         if word_count > 300:
-            # Find positions of all links
-            link_matches = list(re.finditer(link_pattern, text, re.IGNORECASE | re.DOTALL))
-            
             # Try to truncate while preserving at least 3 links
             if link_count >= 3:
                 # Find where the 3rd link ends
-                if len(link_matches) >= 3:
-                    third_link_end = link_matches[2].end()
-                    # Truncate to preserve first 3 links
-                    truncated = text[:third_link_end]
-                    # Count words in truncated version
-                    truncated_text_for_count = re.sub(r'<[^>]+>', '', truncated)
-                    truncated_word_count = len(truncated_text_for_count.split())
-                    
-                    # If still over 300 words, truncate by words but try to preserve links
-                    if truncated_word_count > 300:
-                        # Truncate by words, but keep complete links
-                        words_list = text_for_word_count.split()[:300]
-                        # Find the position of the 300th word in original text
-                        word_pos = len(' '.join(words_list))
-                        # Find the nearest complete link before this position
-                        for link_match in reversed(link_matches[:3]):
-                            if link_match.end() <= len(text[:word_pos + 100]):  # Add buffer
-                                text = text[:link_match.end()]
-                                break
-                    else:
-                        text = truncated
+                third_link_end = link_matches[2].end()
+                # Truncate to preserve first 3 links
+                truncated = text[:third_link_end]
+                # Count words in truncated version
+                truncated_word_count = len(_RE_HTML_TAG.sub('', truncated).split())
+                
+                # If still over 300 words, truncate by words but try to preserve links
+                if truncated_word_count > 300:
+                    # Truncate by words, but keep complete links
+                    # Find the position of the 300th word in original text
+                    word_pos = len(' '.join(words[:300]))
+                    # Find the nearest complete link before this position
+                    for link_match in reversed(link_matches[:3]):
+                        if link_match.end() <= len(text[:word_pos + 100]):  # Add buffer
+                            text = text[:link_match.end()]
+                            break
                 else:
-                    # Fallback: truncate by words
-                    words_list = text_for_word_count.split()[:300]
-                    text = ' '.join(words_list)
+                    text = truncated
             else:
                 # Not enough links, just truncate by words
-                words_list = text_for_word_count.split()[:300]
-                text = ' '.join(words_list)
+                text = ' '.join(words[:300])
             
             # Re-count after truncation
-            links = re.findall(link_pattern, text, re.IGNORECASE | re.DOTALL)
-            link_count = len(links)
+            link_matches = list(_RE_WIKI_LINK.finditer(text))
+            link_count = len(link_matches)
         
         # If link count is not 3, try to fix
-        if link_count != 3:
-            if link_count > 3:
-                # Remove excess links, keeping first 3
-                link_matches = list(re.finditer(link_pattern, text, re.IGNORECASE | re.DOTALL))
-                if len(link_matches) > 3:
-                    # Keep text up to end of 3rd link
-                    text = text[:link_matches[2].end()]
-                    # Re-count to verify
-                    links = re.findall(link_pattern, text, re.IGNORECASE | re.DOTALL)
-                    link_count = len(links)
-            # If link_count < 3, we can't automatically add links - return as is
-            # The prompt should have ensured 3 links, but we handle edge cases
+        if link_count > 3:
+            # Remove excess links, keeping first 3 (text up to end of 3rd link)
+            text = text[:link_matches[2].end()]
+        # If link_count < 3, we can't automatically add links - return as is
+        # The prompt should have ensured 3 links, but we handle edge cases
         
         return text
     
@@ -351,8 +752,8 @@ Return ONLY the text with links added, no preamble or explanation:"""
         result = response.choices[0].message.content.strip()
         
         # Clean up any markdown code blocks if present
-        result = re.sub(r'^```html?\n', '', result)
-        result = re.sub(r'\n```$', '', result)
+        result = _RE_FENCE_OPEN.sub('', result)
+        result = _RE_FENCE_CLOSE.sub('', result)
         
         return result
     
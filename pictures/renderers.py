@@ -0,0 +1,36 @@
+"""
+API renderers for Picture of the Day
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson encodes responses faster; the stdlib-based JSONRenderer is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson
+
+    Dates and types orjson doesn't know (lazy strings, Decimal, ...) go
+    through DRF's JSONEncoder so they render as before. Indented output,
+    as requested by the browsable API, is left to JSONRenderer.
+    """
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            default=self._encoder.default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
@@ -7,8 +7,8 @@ class PictureOfTheDaySerializer(serializers.ModelSerializer):
     
     display_explanation = serializers.ReadOnlyField()
     display_image_url = serializers.ReadOnlyField()
-    image_size_mb = serializers.ReadOnlyField()
-    image_resolution = serializers.ReadOnlyField()
+    image_size_mb = serializers.FloatField(source='image_size_mb_cached', read_only=True)
+    image_resolution = serializers.CharField(source='image_resolution_cached', read_only=True)
     source_display = serializers.CharField(source='get_source_display', read_only=True)
     
     class Meta:
@@ -40,13 +40,40 @@ class PictureOfTheDayDetailSerializer(serializers.ModelSerializer):
     
     display_explanation = serializers.ReadOnlyField()
     display_image_url = serializers.ReadOnlyField()
-    image_size_mb = serializers.ReadOnlyField()
-    image_resolution = serializers.ReadOnlyField()
+    image_size_mb = serializers.FloatField(source='image_size_mb_cached', read_only=True)
+    image_resolution = serializers.CharField(source='image_resolution_cached', read_only=True)
     source_display = serializers.CharField(source='get_source_display', read_only=True)
     
     class Meta:
         model = PictureOfTheDay
-        fields = '__all__'
+        fields = [
+            'id',
+            'source',
+            'source_display',
+            'date',
+            'title',
+            'original_explanation',
+            'simplified_explanation',
+            'processed_explanation',
+            'display_explanation',
+            'media_type',
+            'image_url',
+            'hd_image_url',
+            'thumbnail_url',
+            'local_image_path',
+            'display_image_url',
+            'image_width',
+            'image_height',
+            'image_size_bytes',
+            'image_size_mb',
+            'image_resolution',
+            'copyright',
+            'source_url',
+            'is_processed',
+            'processing_error',
+            'created_at',
+            'updated_at',
+        ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
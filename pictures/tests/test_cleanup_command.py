@@ -1,8 +1,9 @@
 """
 Tests for the cleanup_old_pictures management command
 """
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.core.management import call_command
+from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import date, timedelta
 from io import StringIO
@@ -12,50 +13,31 @@ from pictures.models import PictureOfTheDay, PictureSource
 class CleanupOldPicturesCommandTest(TestCase):
     """Test cases for cleanup_old_pictures management command"""
     
-    def setUp(self):
-        """Set up test data"""
-        # Create pictures with various dates
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once; each test's changes are rolled back"""
+        # Create pictures with various dates: recent ones within the last
+        # 90 days and old ones beyond it
         today = timezone.now().date()
-        
-        # Recent pictures (within last 90 days)
-        for i in range(5):
-            PictureOfTheDay.objects.create(
-                source=PictureSource.APOD,
-                date=today - timedelta(days=i),
-                title=f'Recent APOD {i}',
-                original_explanation='Test explanation',
-                image_url='https://example.com/image.jpg'
-            )
-        
-        # Old pictures (older than 90 days)
-        for i in range(10):
-            PictureOfTheDay.objects.create(
-                source=PictureSource.APOD,
-                date=today - timedelta(days=95 + i),
-                title=f'Old APOD {i}',
+        cls.recent_dates = [today - timedelta(days=i) for i in range(5)]
+        cls.old_dates = [today - timedelta(days=95 + i) for i in range(10)]
+        
+        def picture(source, picture_date, title):
+            return PictureOfTheDay(
+                source=source,
+                date=picture_date,
+                title=title,
                 original_explanation='Test explanation',
                 image_url='https://example.com/image.jpg'
             )
         
-        # Wikipedia pictures
-        for i in range(3):
-            PictureOfTheDay.objects.create(
-                source=PictureSource.WIKIPEDIA,
-                date=today - timedelta(days=i),
-                title=f'Recent Wikipedia {i}',
-                original_explanation='Test explanation',
-                image_url='https://example.com/image.jpg'
-            )
-        
-        # Old Wikipedia pictures
-        for i in range(5):
-            PictureOfTheDay.objects.create(
-                source=PictureSource.WIKIPEDIA,
-                date=today - timedelta(days=95 + i),
-                title=f'Old Wikipedia {i}',
-                original_explanation='Test explanation',
-                image_url='https://example.com/image.jpg'
-            )
+        PictureOfTheDay.objects.bulk_create(
+            [picture(PictureSource.APOD, d, f'Recent APOD {i}') for i, d in enumerate(cls.recent_dates)]
+            + [picture(PictureSource.APOD, d, f'Old APOD {i}') for i, d in enumerate(cls.old_dates)]
+            + [picture(PictureSource.WIKIPEDIA, d, f'Recent Wikipedia {i}') for i, d in enumerate(cls.recent_dates[:3])]
+            + [picture(PictureSource.WIKIPEDIA, d, f'Old Wikipedia {i}') for i, d in enumerate(cls.old_dates[:5])],
+            batch_size=500
+        )
     
     def test_cleanup_removes_old_pictures(self):
         """Test that old pictures are removed"""
@@ -63,26 +45,41 @@ class CleanupOldPicturesCommandTest(TestCase):
         apod_count_before = PictureOfTheDay.objects.filter(source=PictureSource.APOD).count()
         self.assertEqual(apod_count_before, 15)  # 5 recent + 10 old
         
-        # Run cleanup with default settings (90 days, keep 10)
-        call_command('cleanup_old_pictures', days=90, keep_min=10)
+        # Run cleanup with default settings (90 days, keep 10). The counts
+        # come from one aggregate query and each source's old pictures go
+        # in a single DELETE inside the transaction's savepoint, however
+        # many pictures there are.
+        with self.assertNumQueries(4):
+            call_command('cleanup_old_pictures', days=90, keep_min=10, verbosity=0)
         
-        # Count after cleanup
-        apod_count_after = PictureOfTheDay.objects.filter(source=PictureSource.APOD).count()
+        # Count after cleanup, all and recent ones in one query
+        today = timezone.now().date()
+        stats = PictureOfTheDay.objects.filter(source=PictureSource.APOD).aggregate(
+            total=Count('id'),
+            recent=Count('id', filter=Q(date__gte=today - timedelta(days=90)))
+        )
         # Should keep 10 (5 recent + 5 old to meet minimum)
-        self.assertEqual(apod_count_after, 10)
+        self.assertEqual(stats['total'], 10)
         
         # Verify recent pictures are still there
-        today = timezone.now().date()
-        recent_count = PictureOfTheDay.objects.filter(
-            source=PictureSource.APOD,
-            date__gte=today - timedelta(days=90)
-        ).count()
-        self.assertEqual(recent_count, 5)
+        self.assertEqual(stats['recent'], 5)
+    
+    @override_settings(USE_RAW_CLEANUP=True)
+    def test_cleanup_raw_sql(self):
+        """Test that the raw SQL delete removes the same pictures"""
+        call_command('cleanup_old_pictures', days=90, keep_min=10, verbosity=0)
+        
+        # APOD keeps 5 recent + 5 old to meet minimum; Wikipedia keeps all 8
+        apod_dates = set(
+            PictureOfTheDay.objects.filter(source=PictureSource.APOD).values_list('date', flat=True)
+        )
+        self.assertEqual(apod_dates, set(self.recent_dates) | set(self.old_dates[:5]))
+        self.assertEqual(PictureOfTheDay.objects.filter(source=PictureSource.WIKIPEDIA).count(), 8)
     
     def test_cleanup_respects_keep_min(self):
         """Test that minimum number of pictures is kept"""
         # Run cleanup with keep_min=15
-        call_command('cleanup_old_pictures', days=90, keep_min=15)
+        call_command('cleanup_old_pictures', days=90, keep_min=15, verbosity=0)
         
         # Should keep at least 15 APOD pictures
         apod_count = PictureOfTheDay.objects.filter(source=PictureSource.APOD).count()
@@ -105,10 +102,18 @@ class CleanupOldPicturesCommandTest(TestCase):
         self.assertIn('DRY RUN', output)
         self.assertIn('Would delete', output)
     
+    def test_cleanup_quiet(self):
+        """Test that verbosity 0 deletes without writing any output"""
+        out = StringIO()
+        call_command('cleanup_old_pictures', days=90, keep_min=10, verbosity=0, stdout=out)
+        
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(PictureOfTheDay.objects.filter(source=PictureSource.APOD).count(), 10)
+    
     def test_cleanup_source_filter(self):
         """Test cleanup with source filter"""
         # Clean up only APOD
-        call_command('cleanup_old_pictures', days=90, keep_min=10, source='apod')
+        call_command('cleanup_old_pictures', days=90, keep_min=10, source='apod', verbosity=0)
         
         # APOD should be cleaned
         apod_count = PictureOfTheDay.objects.filter(source=PictureSource.APOD).count()
@@ -121,17 +126,19 @@ class CleanupOldPicturesCommandTest(TestCase):
     def test_cleanup_all_sources(self):
         """Test cleanup processes all sources"""
         # Run cleanup
-        call_command('cleanup_old_pictures', days=90, keep_min=10)
+        call_command('cleanup_old_pictures', days=90, keep_min=10, verbosity=0)
         
         # Both sources should be processed
-        apod_count = PictureOfTheDay.objects.filter(source=PictureSource.APOD).count()
-        wikipedia_count = PictureOfTheDay.objects.filter(source=PictureSource.WIKIPEDIA).count()
+        stats = PictureOfTheDay.objects.aggregate(
+            apod=Count('id', filter=Q(source=PictureSource.APOD)),
+            wikipedia=Count('id', filter=Q(source=PictureSource.WIKIPEDIA))
+        )
         
         # APOD: 15 total, should keep 10
-        self.assertEqual(apod_count, 10)
+        self.assertEqual(stats['apod'], 10)
         
         # Wikipedia: 8 total, but only 3 recent, so should keep 10 (all of them)
-        self.assertEqual(wikipedia_count, 8)
+        self.assertEqual(stats['wikipedia'], 8)
     
     def test_cleanup_no_old_pictures(self):
         """Test cleanup when no old pictures exist"""
@@ -156,7 +163,7 @@ class CleanupOldPicturesCommandTest(TestCase):
     def test_cleanup_custom_days(self):
         """Test cleanup with custom retention period"""
         # Use 5 days retention
-        call_command('cleanup_old_pictures', days=5, keep_min=10)
+        call_command('cleanup_old_pictures', days=5, keep_min=10, verbosity=0)
         
         # Should keep more pictures since cutoff is more recent
         apod_count = PictureOfTheDay.objects.filter(source=PictureSource.APOD).count()
@@ -1,15 +1,30 @@
 """
 Tests for the fetch_picture management command
 """
-from django.test import TestCase
+import threading
+from django.test import TestCase, override_settings
 from django.core.management import call_command
 from django.utils import timezone
-from datetime import date
+from datetime import date, timedelta
 from io import StringIO
 from unittest.mock import patch, MagicMock
 from pictures.models import PictureOfTheDay, PictureSource
 
 
+def _mock_fetcher(picture_date, title='Test Picture', explanation='Test explanation',
+                  image_url='https://example.com/image.jpg'):
+    """Build a mock fetcher whose fetch() returns one image picture"""
+    fetcher = MagicMock()
+    fetcher.fetch.return_value = {
+        'date': picture_date.strftime('%Y-%m-%d'),
+        'title': title,
+        'explanation': explanation,
+        'image_url': image_url,
+        'media_type': 'image'
+    }
+    return fetcher
+
+
 class FetchPictureCommandTest(TestCase):
     """Test cases for fetch_picture management command"""
     
@@ -18,41 +33,42 @@ class FetchPictureCommandTest(TestCase):
         pass
     
     @patch('pictures.management.commands.fetch_picture.get_fetcher')
-    def test_fetch_picture_creates_new(self, mock_get_fetcher):
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    def test_fetch_picture_creates_new(self, mock_image_processor, mock_get_fetcher):
         """Test that fetch_picture creates a new picture"""
-        # Mock the fetcher
-        mock_fetcher = MagicMock()
-        mock_get_fetcher.return_value = mock_fetcher
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
         
-        # Mock fetch response
         today = date.today()
-        mock_fetcher.fetch.return_value = {
-            'date': today.strftime('%Y-%m-%d'),
-            'title': 'Test Picture',
-            'explanation': 'Test explanation',
-            'image_url': 'https://example.com/image.jpg',
-            'media_type': 'image'
-        }
+        
+        # Mock the fetcher
+        mock_get_fetcher.return_value = _mock_fetcher(today)
         
         # Count before
         count_before = PictureOfTheDay.objects.count()
         
         # Run command
         out = StringIO()
-        call_command('fetch_picture', source='apod', stdout=out, stderr=out)
+        # Lookup, insert in a savepoint, and the processed-text update
+        with self.assertNumQueries(5):
+            call_command('fetch_picture', source='apod', stdout=out, stderr=out)
         
         # Count after
         count_after = PictureOfTheDay.objects.count()
         self.assertEqual(count_after, count_before + 1)
         
         # Verify picture was created
-        picture = PictureOfTheDay.objects.get(source=PictureSource.APOD, date=today)
-        self.assertEqual(picture.title, 'Test Picture')
-        self.assertEqual(picture.original_explanation, 'Test explanation')
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.APOD, date=today
+        ).values('title', 'original_explanation').get()
+        self.assertEqual(picture['title'], 'Test Picture')
+        self.assertEqual(picture['original_explanation'], 'Test explanation')
     
     @patch('pictures.management.commands.fetch_picture.get_fetcher')
-    def test_fetch_picture_does_not_duplicate(self, mock_get_fetcher):
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    def test_fetch_picture_does_not_duplicate(self, mock_image_processor, mock_get_fetcher):
         """Test that fetch_picture doesn't create duplicates"""
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
+        
         # Create existing picture
         today = date.today()
         PictureOfTheDay.objects.create(
@@ -64,15 +80,7 @@ class FetchPictureCommandTest(TestCase):
         )
         
         # Mock the fetcher
-        mock_fetcher = MagicMock()
-        mock_get_fetcher.return_value = mock_fetcher
-        mock_fetcher.fetch.return_value = {
-            'date': today.strftime('%Y-%m-%d'),
-            'title': 'New Picture',
-            'explanation': 'New explanation',
-            'image_url': 'https://example.com/image.jpg',
-            'media_type': 'image'
-        }
+        mock_get_fetcher.return_value = _mock_fetcher(today, title='New Picture', explanation='New explanation')
         
         # Count before
         count_before = PictureOfTheDay.objects.count()
@@ -86,8 +94,10 @@ class FetchPictureCommandTest(TestCase):
         self.assertEqual(count_after, count_before)
         
         # Picture should still have original title
-        picture = PictureOfTheDay.objects.get(source=PictureSource.APOD, date=today)
-        self.assertEqual(picture.title, 'Existing Picture')
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.APOD, date=today
+        ).values('title').get()
+        self.assertEqual(picture['title'], 'Existing Picture')
     
     @patch('pictures.management.commands.fetch_picture.get_fetcher')
     @patch('pictures.management.commands.fetch_picture.ImageProcessor')
@@ -106,15 +116,12 @@ class FetchPictureCommandTest(TestCase):
         )
         
         # Mock the fetcher
-        mock_fetcher = MagicMock()
-        mock_get_fetcher.return_value = mock_fetcher
-        mock_fetcher.fetch.return_value = {
-            'date': today.strftime('%Y-%m-%d'),
-            'title': 'New Title',
-            'explanation': 'New explanation',
-            'image_url': 'https://example.com/new-image.jpg',
-            'media_type': 'image'
-        }
+        mock_get_fetcher.return_value = _mock_fetcher(
+            today,
+            title='New Title',
+            explanation='New explanation of the picture, long enough to be summarized',
+            image_url='https://example.com/new-image.jpg'
+        )
         
         # Mock image processor
         mock_img_processor_instance = MagicMock()
@@ -131,38 +138,37 @@ class FetchPictureCommandTest(TestCase):
         call_command('fetch_picture', source='apod', force=True, stdout=out, stderr=out)
         
         # Picture should be updated
-        picture = PictureOfTheDay.objects.get(source=PictureSource.APOD, date=today)
-        self.assertEqual(picture.title, 'New Title')
-        self.assertEqual(picture.original_explanation, 'New explanation')
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.APOD, date=today
+        ).values('title', 'original_explanation', 'is_processed').get()
+        self.assertEqual(picture['title'], 'New Title')
+        self.assertEqual(picture['original_explanation'], 'New explanation of the picture, long enough to be summarized')
         # When force is used, is_processed is reset to False in save_picture,
         # then process_text runs and sets it back to True
-        self.assertTrue(picture.is_processed)
+        self.assertTrue(picture['is_processed'])
         # Verify that processing was called (indicating the reset allowed reprocessing)
         mock_txt_processor_instance.process_picture_description.assert_called_once()
     
     @patch('pictures.management.commands.fetch_picture.get_fetcher')
-    def test_fetch_picture_with_date(self, mock_get_fetcher):
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    def test_fetch_picture_with_date(self, mock_image_processor, mock_get_fetcher):
         """Test fetching picture for specific date"""
-        # Mock the fetcher
-        mock_fetcher = MagicMock()
-        mock_get_fetcher.return_value = mock_fetcher
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
         
         target_date = date(2024, 1, 15)
-        mock_fetcher.fetch.return_value = {
-            'date': target_date.strftime('%Y-%m-%d'),
-            'title': 'Specific Date Picture',
-            'explanation': 'Test explanation',
-            'image_url': 'https://example.com/image.jpg',
-            'media_type': 'image'
-        }
+        
+        # Mock the fetcher
+        mock_get_fetcher.return_value = _mock_fetcher(target_date, title='Specific Date Picture')
         
         # Run command with date
         out = StringIO()
         call_command('fetch_picture', source='apod', date='2024-01-15', stdout=out, stderr=out)
         
         # Verify picture was created with correct date
-        picture = PictureOfTheDay.objects.get(source=PictureSource.APOD, date=target_date)
-        self.assertEqual(picture.title, 'Specific Date Picture')
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.APOD, date=target_date
+        ).values('title').get()
+        self.assertEqual(picture['title'], 'Specific Date Picture')
     
     @patch('pictures.management.commands.fetch_picture.get_fetcher')
     def test_fetch_picture_invalid_date(self, mock_get_fetcher):
@@ -187,18 +193,10 @@ class FetchPictureCommandTest(TestCase):
     @patch('pictures.management.commands.fetch_picture.ImageProcessor')
     def test_fetch_picture_get_metadata(self, mock_image_processor, mock_get_fetcher):
         """Test that image metadata is retrieved"""
-        # Mock the fetcher
-        mock_fetcher = MagicMock()
-        mock_get_fetcher.return_value = mock_fetcher
-        
         today = date.today()
-        mock_fetcher.fetch.return_value = {
-            'date': today.strftime('%Y-%m-%d'),
-            'title': 'Test Picture',
-            'explanation': 'Test explanation',
-            'image_url': 'https://example.com/image.jpg',
-            'media_type': 'image'
-        }
+        
+        # Mock the fetcher
+        mock_get_fetcher.return_value = _mock_fetcher(today)
         
         # Mock image processor
         mock_processor_instance = MagicMock()
@@ -210,34 +208,294 @@ class FetchPictureCommandTest(TestCase):
         call_command('fetch_picture', source='apod', stdout=out, stderr=out)
         
         # Verify metadata was set
-        picture = PictureOfTheDay.objects.get(source=PictureSource.APOD, date=today)
-        self.assertEqual(picture.image_width, 1920)
-        self.assertEqual(picture.image_height, 1080)
-        self.assertEqual(picture.image_size_bytes, 1024000)
-    
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.APOD, date=today
+        ).values('image_width', 'image_height', 'image_size_bytes').get()
+        self.assertEqual(picture['image_width'], 1920)
+        self.assertEqual(picture['image_height'], 1080)
+        self.assertEqual(picture['image_size_bytes'], 1024000)
+
     @patch('pictures.management.commands.fetch_picture.get_fetcher')
-    def test_fetch_picture_all_sources(self, mock_get_fetcher):
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    def test_fetch_picture_size_only(self, mock_image_processor, mock_get_fetcher):
+        """Test that only a HEAD request is made when just the size is missing"""
+        today = date.today()
+        PictureOfTheDay.objects.create(
+            source=PictureSource.APOD,
+            date=today,
+            title='Test Picture',
+            original_explanation='Test explanation',
+            image_url='https://example.com/image.jpg',
+            image_width=1920,
+            image_height=1080,
+            is_processed=True
+        )
+        mock_get_fetcher.return_value = _mock_fetcher(today)
+        mock_processor_instance = mock_image_processor.return_value
+        mock_processor_instance.get_image_size.return_value = 1024000
+
+        out = StringIO()
+        call_command('fetch_picture', source='apod', stdout=out, stderr=out)
+
+        mock_processor_instance.get_image_size.assert_called_once_with('https://example.com/image.jpg')
+        mock_processor_instance.get_image_metadata.assert_not_called()
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.APOD, date=today
+        ).values('image_size_bytes').get()
+        self.assertEqual(picture['image_size_bytes'], 1024000)
+
+    @patch('pictures.management.commands.fetch_picture.get_fetcher')
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    def test_fetch_picture_all_sources(self, mock_image_processor, mock_get_fetcher):
         """Test fetching from different sources"""
-        sources = ['apod', 'wikipedia', 'bing']
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
+        
         today = date.today()
         
-        for source in sources:
-            # Mock the fetcher
-            mock_fetcher = MagicMock()
-            mock_get_fetcher.return_value = mock_fetcher
-            mock_fetcher.fetch.return_value = {
-                'date': today.strftime('%Y-%m-%d'),
-                'title': f'{source} Picture',
+        # One mock fetcher serves every source; only its title changes
+        mock_fetcher = _mock_fetcher(today)
+        mock_get_fetcher.return_value = mock_fetcher
+        picture_data = mock_fetcher.fetch.return_value
+        out = StringIO()
+        
+        for source in ['apod', 'wikipedia', 'bing']:
+            with self.subTest(source=source):
+                picture_data['title'] = f'{source} Picture'
+                call_command('fetch_picture', source=source, stdout=out, stderr=out)
+                
+                # Verify picture was created
+                picture = PictureOfTheDay.objects.filter(
+                    source=source, date=today
+                ).values('title').get()
+                self.assertEqual(picture['title'], f'{source} Picture')
+    
+    @override_settings(FETCH_WORKERS=1)
+    @patch('pictures.management.commands.fetch_picture.get_fetcher')
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    @patch('pictures.management.commands.fetch_picture.TextProcessor')
+    def test_fetch_all_bulk_saves(self, mock_text_processor, mock_image_processor, mock_get_fetcher):
+        """Test that --fetch-all creates new pictures and refreshes existing ones with --force"""
+        PictureOfTheDay.objects.create(
+            source=PictureSource.BING,
+            date=date(2024, 1, 1),
+            title='Old Title',
+            original_explanation='Old explanation',
+            image_url='https://example.com/old.jpg',
+            is_processed=True
+        )
+        
+        mock_fetcher = MagicMock()
+        mock_get_fetcher.return_value = mock_fetcher
+        mock_fetcher.fetch_all_available.return_value = [
+            {
+                'date': f'2024-01-0{day}',
+                'title': f'Picture {day}',
+                'explanation': 'Test explanation, long enough to be summarized by OpenAI',
+                'image_url': f'https://example.com/{day}.jpg',
+                'media_type': 'image'
+            }
+            for day in (1, 2, 3)
+        ]
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
+        
+        mock_text_processor.return_value.process_picture_description.return_value = 'Processed'
+        
+        out = StringIO()
+        # One lookup, bulk insert, bulk update and reload for the whole
+        # batch, then a claim and a save per processed picture
+        with self.assertNumQueries(4 + 2 * 3):
+            call_command('fetch_picture', source='bing', fetch_all=True, force=True, stdout=out, stderr=out)
+        
+        self.assertEqual(PictureOfTheDay.objects.filter(source=PictureSource.BING).count(), 3)
+        refreshed = PictureOfTheDay.objects.filter(
+            source=PictureSource.BING, date=date(2024, 1, 1)
+        ).values('title', 'image_url').get()
+        self.assertEqual(refreshed['title'], 'Picture 1')
+        self.assertEqual(refreshed['image_url'], 'https://example.com/1.jpg')
+        output = out.getvalue()
+        self.assertIn('Exists: Picture 1', output)
+        self.assertIn('Created: Picture 2', output)
+        self.assertEqual(mock_text_processor.return_value.process_picture_description.call_count, 3)
+    
+    @override_settings(FETCH_WORKERS=1)
+    @patch('pictures.management.commands.fetch_picture.get_fetcher')
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    @patch('pictures.management.commands.fetch_picture.TextProcessor')
+    def test_fetch_all_skips_pictures_claimed_by_another_run(self, mock_text_processor, mock_image_processor, mock_get_fetcher):
+        """Test that --fetch-all leaves recently claimed pictures alone but reclaims stale ones"""
+        now = timezone.now()
+        for day, started_at in ((1, now), (2, now - timedelta(hours=1))):
+            PictureOfTheDay.objects.create(
+                source=PictureSource.BING,
+                date=date(2024, 1, day),
+                title=f'Picture {day}',
+                original_explanation='Test explanation, long enough to be summarized by OpenAI',
+                image_url='https://example.com/image.jpg',
+                processing_started_at=started_at
+            )
+        
+        mock_fetcher = MagicMock()
+        mock_get_fetcher.return_value = mock_fetcher
+        mock_fetcher.fetch_all_available.return_value = [
+            {
+                'date': f'2024-01-0{day}',
+                'title': f'Picture {day}',
+                'explanation': 'Test explanation, long enough to be summarized by OpenAI',
+                'image_url': 'https://example.com/image.jpg',
+                'media_type': 'image'
+            }
+            for day in (1, 2)
+        ]
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
+        
+        mock_text_processor.return_value.process_picture_description.return_value = 'Processed'
+        
+        out = StringIO()
+        call_command('fetch_picture', source='bing', fetch_all=True, stdout=out, stderr=out)
+        
+        self.assertIn('Skipped: being processed by another run', out.getvalue())
+        claimed = PictureOfTheDay.objects.filter(
+            source=PictureSource.BING, date=date(2024, 1, 1)
+        ).values('is_processed').get()
+        self.assertFalse(claimed['is_processed'])
+        stale = PictureOfTheDay.objects.filter(
+            source=PictureSource.BING, date=date(2024, 1, 2)
+        ).values('is_processed', 'processing_started_at').get()
+        self.assertTrue(stale['is_processed'])
+        self.assertIsNone(stale['processing_started_at'])
+        mock_text_processor.return_value.process_picture_description.assert_called_once()
+    
+    @override_settings(FETCH_WORKERS=1)
+    @patch('pictures.management.commands.fetch_picture.get_fetcher')
+    @patch('pictures.management.commands.fetch_picture.ImageProcessor')
+    @patch('pictures.management.commands.fetch_picture.TextProcessor')
+    def test_fetch_all_continues_after_picture_error(self, mock_text_processor, mock_image_processor, mock_get_fetcher):
+        """Test that one failing picture doesn't abort the rest of a --fetch-all batch"""
+        mock_fetcher = MagicMock()
+        mock_get_fetcher.return_value = mock_fetcher
+        mock_fetcher.fetch_all_available.return_value = [
+            {
+                'date': f'2024-01-0{day}',
+                'title': f'Picture {day}',
+                'explanation': f'Explanation {day}, long enough to be summarized by OpenAI',
+                'image_url': 'https://example.com/image.jpg',
+                'media_type': 'image'
+            }
+            for day in (1, 2)
+        ]
+        mock_image_processor.return_value.get_image_metadata.return_value = (None, None, None)
+        
+        mock_text_processor.return_value.process_picture_description.side_effect = [
+            Exception('OpenAI unavailable'), 'Processed'
+        ]
+        
+        out = StringIO()
+        call_command('fetch_picture', source='bing', fetch_all=True, stdout=out, stderr=out)
+        
+        output = out.getvalue()
+        self.assertIn('Error processing 2024-01-01: OpenAI unavailable', output)
+        self.assertNotIn('Traceback', output)
+        failed = PictureOfTheDay.objects.filter(
+            source=PictureSource.BING, date=date(2024, 1, 1)
+        ).values('processing_error').get()
+        self.assertEqual(failed['processing_error'], 'OpenAI unavailable')
+        self.assertTrue(PictureOfTheDay.objects.get(source=PictureSource.BING, date=date(2024, 1, 2)).is_processed)
+    
+    @override_settings(FETCH_WORKERS=1)
+    @patch('pictures.management.commands.fetch_picture.get_fetcher')
+    @patch('pictures.management.commands.fetch_picture.TextProcessor')
+    def test_fetch_all_releases_claim_after_metadata_error(self, mock_text_processor, mock_get_fetcher):
+        """Test that a picture failing before the text step isn't left claimed"""
+        from pictures.management.commands.fetch_picture import Command
+        
+        mock_fetcher = MagicMock()
+        mock_get_fetcher.return_value = mock_fetcher
+        mock_fetcher.fetch_all_available.return_value = [{
+            'date': '2024-01-01',
+            'title': 'Picture 1',
+            'explanation': 'Test explanation, long enough to be summarized by OpenAI',
+            'image_url': 'https://example.com/image.jpg',
+            'media_type': 'image'
+        }]
+        
+        out = StringIO()
+        with patch.object(Command, 'get_image_metadata', side_effect=Exception('Image host down')):
+            call_command('fetch_picture', source='bing', fetch_all=True, stdout=out, stderr=out)
+        
+        self.assertIn('Error processing 2024-01-01: Image host down', out.getvalue())
+        picture = PictureOfTheDay.objects.filter(
+            source=PictureSource.BING, date=date(2024, 1, 1)
+        ).values('is_processed', 'processing_started_at').get()
+        self.assertFalse(picture['is_processed'])
+        self.assertIsNone(picture['processing_started_at'])
+        mock_text_processor.return_value.process_picture_description.assert_not_called()
+    
+    @override_settings(FETCH_WORKERS=3)
+    @patch('pictures.management.commands.fetch_picture.get_fetcher')
+    @patch('pictures.management.commands.fetch_picture.TextProcessor')
+    def test_fetch_all_with_worker_threads(self, mock_text_processor, mock_get_fetcher):
+        """Test that --fetch-all hands each picture to a worker thread and writes all their output"""
+        from pictures.management.commands.fetch_picture import Command
+        
+        mock_fetcher = MagicMock()
+        mock_get_fetcher.return_value = mock_fetcher
+        mock_fetcher.fetch_all_available.return_value = [
+            {
+                'date': f'2024-01-0{day}',
+                'title': f'Picture {day}',
                 'explanation': 'Test explanation',
                 'image_url': 'https://example.com/image.jpg',
                 'media_type': 'image'
             }
-            
-            # Run command
-            out = StringIO()
-            call_command('fetch_picture', source=source, stdout=out, stderr=out)
-            
-            # Verify picture was created
-            picture = PictureOfTheDay.objects.get(source=source, date=today)
-            self.assertEqual(picture.title, f'{source} Picture')
-
+            for day in (1, 2, 3)
+        ]
+        
+        # Worker threads use their own DB connections, which can't see this
+        # test's transaction, so the per-picture steps are replaced
+        threads = {}
+        
+        def process_picture(command, picture, *args):
+            threads[picture.date] = threading.current_thread().name
+            return f'Done {picture.title}\n'
+        
+        out = StringIO()
+        with patch.object(Command, 'process_picture', process_picture):
+            call_command('fetch_picture', source='bing', fetch_all=True, stdout=out, stderr=out)
+        
+        output = out.getvalue()
+        for day in (1, 2, 3):
+            self.assertIn(f'Done Picture {day}', output)
+        self.assertEqual(len(threads), 3)
+        self.assertTrue(all(name.startswith('fetch-picture') for name in threads.values()))
+        # The shared OpenAI client is built once, before the workers start
+        mock_text_processor.assert_called_once()
+    
+    @patch('pictures.management.commands.fetch_picture.TextProcessor')
+    def test_process_text_skips_openai_when_not_needed(self, mock_text_processor):
+        """Test that unchanged and very short explanations are not sent to OpenAI"""
+        from pictures.management.commands.fetch_picture import Command
+        
+        mock_text_processor.return_value.process_picture_description.return_value = 'Processed summary'
+        picture = PictureOfTheDay.objects.create(
+            source=PictureSource.APOD,
+            date=date(2024, 1, 1),
+            title='Test Picture',
+            original_explanation='Test explanation, long enough to be summarized by OpenAI',
+            image_url='https://example.com/image.jpg'
+        )
+        command = Command(stdout=StringIO())
+        
+        command.process_text(picture, 'apod')
+        picture.is_processed = False
+        command.process_text(picture, 'apod')
+        mock_text_processor.return_value.process_picture_description.assert_called_once()
+        picture.refresh_from_db()
+        self.assertTrue(picture.is_processed)
+        self.assertEqual(picture.processed_explanation, 'Processed summary')
+        
+        picture.original_explanation = 'Short caption'
+        command.process_text(picture, 'apod')
+        mock_text_processor.return_value.process_picture_description.assert_called_once()
+        picture.refresh_from_db()
+        self.assertEqual(picture.simplified_explanation, 'Short caption')
+        self.assertIsNone(picture.processed_explanation)
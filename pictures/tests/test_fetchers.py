@@ -1,10 +1,13 @@
 """
 Unit tests for picture fetchers
 """
-from django.test import TestCase
+import json
+import requests
+from django.test import SimpleTestCase, override_settings
 from unittest.mock import patch, MagicMock
 from datetime import date, timedelta
 from pictures.fetchers import (
+    BasePictureFetcher,
     APODFetcher,
     WikipediaPODFetcher,
     BingPODFetcher,
@@ -12,27 +15,55 @@ from pictures.fetchers import (
 )
 
 
-class APODFetcherTest(TestCase):
+def _json_response(data):
+    """Build a successful requests.Response carrying data as JSON"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode()
+    return response
+
+
+# Bing archive payload with two days of images. _json_response serializes
+# it, so tests share it without copying.
+_BING_ARCHIVE = {
+    'images': [
+        {
+            'startdate': '20240115',
+            'url': '/th?id=OHR.Test1_1920x1080.jpg',
+            'title': 'Test 1',
+            'copyright': 'Copyright 1'
+        },
+        {
+            'startdate': '20240114',
+            'url': '/th?id=OHR.Test2_1920x1080.jpg',
+            'title': 'Test 2',
+            'copyright': 'Copyright 2'
+        }
+    ]
+}
+
+
+class APODFetcherTest(SimpleTestCase):
     """Test cases for APODFetcher"""
     
+    # Fetchers hold no state, so one instance serves every test
+    fetcher = APODFetcher()
+    test_date = date(2024, 1, 15)
+    
     def setUp(self):
-        """Set up test data"""
-        self.fetcher = APODFetcher()
-        self.test_date = date(2024, 1, 15)
+        """Start each test with an empty fetch cache"""
+        BasePictureFetcher.clear_cache()
     
     def test_source_name(self):
         """Test that source_name is set correctly"""
         self.assertEqual(self.fetcher.source_name, 'apod')
     
-    @patch('pictures.fetchers.requests.get')
-    @patch('pictures.fetchers.settings')
-    def test_fetch_success(self, mock_settings, mock_get):
+    @override_settings(NASA_API_KEY='test_key')
+    @patch('pictures.fetchers._SESSION.get')
+    def test_fetch_success(self, mock_get):
         """Test successful fetch from NASA API"""
-        mock_settings.NASA_API_KEY = 'test_key'
-        
         # Mock API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             'title': 'Test APOD',
             'date': '2024-01-15',
             'explanation': 'Test explanation',
@@ -40,8 +71,7 @@ class APODFetcherTest(TestCase):
             'hdurl': 'https://apod.nasa.gov/image_hd.jpg',
             'media_type': 'image',
             'copyright': 'Test Copyright'
-        }
-        mock_response.raise_for_status = MagicMock()
+        })
         mock_get.return_value = mock_response
         
         result = self.fetcher.fetch(self.test_date)
@@ -68,72 +98,78 @@ class APODFetcherTest(TestCase):
         url = self.fetcher.get_source_url(self.test_date)
         self.assertEqual(url, 'https://apod.nasa.gov/apod/ap240115.html')
     
-    @patch('pictures.fetchers.requests.get')
-    @patch('pictures.fetchers.settings')
-    def test_fetch_without_hdurl(self, mock_settings, mock_get):
+    @override_settings(NASA_API_KEY='test_key')
+    @patch('pictures.fetchers._SESSION.get')
+    def test_fetch_without_hdurl(self, mock_get):
         """Test fetch when hdurl is not available"""
-        mock_settings.NASA_API_KEY = 'test_key'
-        
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             'title': 'Test APOD',
             'date': '2024-01-15',
             'explanation': 'Test explanation',
             'url': 'https://apod.nasa.gov/image.jpg',
             'media_type': 'image'
-        }
-        mock_response.raise_for_status = MagicMock()
+        })
         mock_get.return_value = mock_response
         
         result = self.fetcher.fetch(self.test_date)
         
         self.assertIsNone(result.get('hd_image_url'))
+    
+    @override_settings(NASA_API_KEY='test_key')
+    @patch('pictures.fetchers._SESSION.get')
+    def test_fetch_caches_past_dates(self, mock_get):
+        """Test that past dates are only fetched once unless refreshed"""
+        mock_response = _json_response({
+            'title': 'Test APOD',
+            'date': '2024-01-15',
+            'explanation': 'Test explanation',
+            'url': 'https://apod.nasa.gov/image.jpg',
+            'media_type': 'image'
+        })
+        mock_get.return_value = mock_response
+        
+        first = self.fetcher.fetch(self.test_date)
+        second = self.fetcher.fetch(self.test_date)
+        
+        self.assertEqual(first, second)
+        self.assertEqual(mock_get.call_count, 1)
+        
+        self.fetcher.fetch(self.test_date, refresh=True)
+        self.assertEqual(mock_get.call_count, 2)
 
 
-class WikipediaPODFetcherTest(TestCase):
+class WikipediaPODFetcherTest(SimpleTestCase):
     """Test cases for WikipediaPODFetcher"""
     
+    # Fetchers hold no state, so one instance serves every test
+    fetcher = WikipediaPODFetcher()
+    test_date = date(2024, 1, 15)
+    
     def setUp(self):
-        """Set up test data"""
-        self.fetcher = WikipediaPODFetcher()
-        self.test_date = date(2024, 1, 15)
+        """Start each test with an empty fetch cache"""
+        BasePictureFetcher.clear_cache()
     
     def test_source_name(self):
         """Test that source_name is set correctly"""
         self.assertEqual(self.fetcher.source_name, 'wikipedia')
     
-    @patch('pictures.fetchers.requests.get')
+    @patch('pictures.fetchers._SESSION.get')
     def test_fetch_success(self, mock_get):
         """Test successful fetch from Wikipedia"""
-        # Mock first API call (get images)
-        mock_response1 = MagicMock()
-        mock_response1.json.return_value = {
-            'query': {
-                'pages': [{
-                    'images': [{
-                        'title': 'File:Test_image.jpg'
-                    }]
-                }]
-            }
-        }
-        mock_response1.raise_for_status = MagicMock()
-        
-        # Mock second API call (get image URL)
-        mock_response2 = MagicMock()
-        mock_response2.json.return_value = {
+        # Mock the image lookup (template images with their URLs)
+        mock_response1 = _json_response({
             'query': {
                 'pages': [{
+                    'title': 'File:Test_image.jpg',
                     'imageinfo': [{
                         'url': 'https://upload.wikimedia.org/test_image.jpg'
                     }]
                 }]
             }
-        }
-        mock_response2.raise_for_status = MagicMock()
+        })
         
-        # Mock third API call (get description)
-        mock_response3 = MagicMock()
-        mock_response3.json.return_value = {
+        # Mock the description lookup
+        mock_response2 = _json_response({
             'query': {
                 'pages': [{
                     'revisions': [{
@@ -145,10 +181,15 @@ class WikipediaPODFetcherTest(TestCase):
                     }]
                 }]
             }
-        }
-        mock_response3.raise_for_status = MagicMock()
+        })
         
-        mock_get.side_effect = [mock_response1, mock_response2, mock_response3]
+        # The description is fetched concurrently with the image lookup,
+        # so answer by the requested prop rather than by call order
+        responses = {
+            'imageinfo': mock_response1,
+            'revisions': mock_response2,
+        }
+        mock_get.side_effect = lambda url, params, **kwargs: responses[params['prop']]
         
         result = self.fetcher.fetch(self.test_date)
         
@@ -173,6 +214,17 @@ class WikipediaPODFetcherTest(TestCase):
         self.assertNotIn("[[", cleaned)
         self.assertNotIn("]]", cleaned)
     
+    def test_clean_wikitext_nested_markup(self):
+        """Test bold-italic and markup wrapped around links"""
+        cases = {
+            "'''''Mona Lisa''''' by [[Leonardo]]": 'Mona Lisa by Leonardo',
+            "''[[Mona Lisa]]'' and '''[[Louvre|the Louvre]]'''": 'Mona Lisa and the Louvre',
+            "Salt &amp; pepper&nbsp;moth": 'Salt & pepper moth',
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(self.fetcher._clean_wikitext(text), expected)
+
     def test_clean_filename_title(self):
         """Test filename to title conversion"""
         filename = "File:Test_Image_2024-01-15.jpg"
@@ -181,21 +233,41 @@ class WikipediaPODFetcherTest(TestCase):
         self.assertNotIn(".jpg", title)
         self.assertNotIn("2024-01-15", title)
         self.assertIn("Test Image", title)
+    
+    def test_clean_filename_title_outputs(self):
+        """Test titles for filenames with dates, codes, numbers and stray commas"""
+        cases = {
+            'File:Bridge_A_B-C_D_E-F.jpg': 'Bridge D E-F',
+            'File:Eiffel_Tower,_Paris,_2023-05-01,_,_DD_12-34.jpg': 'Eiffel Tower, Paris',
+            'File:042 Red fox in snow NPS.jpg': 'Red fox in snow',
+            'File:Moon_20240115_ESA.png': 'Moon',
+            'ABC20240115-12-34.jpg': 'ABC2024',
+            'A__DD20240115-12-34.jpg': 'A DD2024',
+            ',,,': '',
+            'File:orchid.jpg': 'Orchid',
+            'x': 'X',
+        }
+        for filename, expected in cases.items():
+            with self.subTest(filename=filename):
+                self.assertEqual(self.fetcher._clean_filename_title(filename), expected)
 
 
-class BingPODFetcherTest(TestCase):
+class BingPODFetcherTest(SimpleTestCase):
     """Test cases for BingPODFetcher"""
     
+    # Fetchers hold no state, so one instance serves every test
+    fetcher = BingPODFetcher()
+    test_date = date(2024, 1, 15)
+    
     def setUp(self):
-        """Set up test data"""
-        self.fetcher = BingPODFetcher()
-        self.test_date = date(2024, 1, 15)
+        """Start each test with an empty fetch cache"""
+        BasePictureFetcher.clear_cache()
     
     def test_source_name(self):
         """Test that source_name is set correctly"""
         self.assertEqual(self.fetcher.source_name, 'bing')
     
-    @patch('pictures.fetchers.requests.get')
+    @patch('pictures.fetchers._SESSION.get')
     @patch('pictures.fetchers.date')
     def test_fetch_success(self, mock_date, mock_get):
         """Test successful fetch from Bing"""
@@ -206,16 +278,14 @@ class BingPODFetcherTest(TestCase):
         mock_date.side_effect = lambda *args, **kwargs: date(*args, **kwargs) if args else mock_date_class
         
         # Mock API response
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response = _json_response({
             'images': [{
                 'startdate': '20240115',
                 'url': '/th?id=OHR.TestImage_1920x1080.jpg',
                 'title': 'Test Bing Image',
                 'copyright': 'Test Copyright'
             }]
-        }
-        mock_response.raise_for_status = MagicMock()
+        })
         mock_get.return_value = mock_response
         
         result = self.fetcher.fetch(self.test_date)
@@ -224,6 +294,7 @@ class BingPODFetcherTest(TestCase):
         self.assertEqual(result['date'], '2024-01-15')
         self.assertEqual(result['explanation'], 'Test Copyright')
         self.assertIn('bing.com', result['image_url'])
+        self.assertEqual(result['hd_image_url'], 'https://www.bing.com/th?id=OHR.TestImage_UHD.jpg')
         self.assertEqual(result['media_type'], 'image')
         self.assertEqual(result['copyright'], 'Test Copyright')
         self.assertEqual(result['source_url'], 'https://www.bing.com')
@@ -233,32 +304,14 @@ class BingPODFetcherTest(TestCase):
         url = self.fetcher.get_source_url(self.test_date)
         self.assertEqual(url, 'https://www.bing.com')
     
-    @patch('pictures.fetchers.requests.get')
+    @patch('pictures.fetchers._SESSION.get')
     @patch('pictures.fetchers.date')
     def test_fetch_all_available(self, mock_date, mock_get):
         """Test fetch_all_available method"""
         mock_date_class = MagicMock()
         mock_date_class.today.return_value = date(2024, 1, 15)
         
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            'images': [
-                {
-                    'startdate': '20240115',
-                    'url': '/th?id=OHR.Test1_1920x1080.jpg',
-                    'title': 'Test 1',
-                    'copyright': 'Copyright 1'
-                },
-                {
-                    'startdate': '20240114',
-                    'url': '/th?id=OHR.Test2_1920x1080.jpg',
-                    'title': 'Test 2',
-                    'copyright': 'Copyright 2'
-                }
-            ]
-        }
-        mock_response.raise_for_status = MagicMock()
-        mock_get.return_value = mock_response
+        mock_get.return_value = _json_response(_BING_ARCHIVE)
         
         results = self.fetcher.fetch_all_available(max_days=8)
         
@@ -266,7 +319,44 @@ class BingPODFetcherTest(TestCase):
         self.assertEqual(results[0]['title'], 'Test 1')
         self.assertEqual(results[1]['title'], 'Test 2')
     
-    @patch('pictures.fetchers.requests.get')
+    @patch('pictures.fetchers._SESSION.get')
+    def test_fetch_all_available_skips_invalid_dates(self, mock_get):
+        """Test that entries with malformed or impossible startdates are dropped"""
+        images = [
+            {**_BING_ARCHIVE['images'][0]},
+            {**_BING_ARCHIVE['images'][1], 'startdate': '20241345'},
+            {**_BING_ARCHIVE['images'][1], 'startdate': '2024011'},
+        ]
+        mock_get.return_value = _json_response({'images': images})
+        
+        results = self.fetcher.fetch_all_available(max_days=8)
+        
+        self.assertEqual([result['date'] for result in results], ['2024-01-15'])
+    
+    @patch('pictures.fetchers._SESSION.get')
+    def test_fetch_caches_only_exact_matches(self, mock_get):
+        """Test that a fallback image standing in for a past date isn't cached"""
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        images = [
+            {**_BING_ARCHIVE['images'][0], 'startdate': today.strftime('%Y%m%d')},
+            {**_BING_ARCHIVE['images'][1], 'startdate': yesterday.strftime('%Y%m%d')},
+        ]
+        mock_get.side_effect = lambda *args, **kwargs: _json_response({'images': images})
+        
+        # Not in the archive, so Bing's fallback (today's image) is returned
+        missing_date = today - timedelta(days=5)
+        for _ in range(2):
+            result = self.fetcher.fetch(missing_date)
+            self.assertEqual(result['title'], 'Test 1')
+            self.assertNotIn('_uncacheable', result)
+        self.assertEqual(mock_get.call_count, 2)
+        
+        for _ in range(2):
+            self.assertEqual(self.fetcher.fetch(yesterday)['title'], 'Test 2')
+        self.assertEqual(mock_get.call_count, 3)
+    
+    @patch('pictures.fetchers._SESSION.get')
     def test_fetch_future_date_error(self, mock_get):
         """Test that fetching future dates raises an error"""
         from datetime import date as date_class
@@ -280,7 +370,7 @@ class BingPODFetcherTest(TestCase):
         self.assertIn('future', str(context.exception).lower())
 
 
-class GetFetcherTest(TestCase):
+class GetFetcherTest(SimpleTestCase):
     """Test cases for get_fetcher factory function"""
     
     def test_get_apod_fetcher(self):
@@ -0,0 +1,181 @@
+"""
+Tests for the process_pictures management command
+"""
+from django.test import TestCase
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+from pictures.models import PictureOfTheDay, PictureSource
+from pictures.utils import explanation_hash
+
+
+class ProcessPicturesCommandTest(TestCase):
+    """Test cases for process_pictures management command"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.explanation = 'A long enough explanation of the picture to be worth summarizing'
+        self.picture = PictureOfTheDay.objects.create(
+            source=PictureSource.APOD,
+            date=date(2024, 1, 1),
+            title='Unprocessed',
+            original_explanation=self.explanation,
+            image_url='https://example.com/image.jpg'
+        )
+        self.failing = PictureOfTheDay.objects.create(
+            source=PictureSource.BING,
+            date=date(2024, 1, 1),
+            title='Will fail',
+            original_explanation=self.explanation,
+            image_url='https://example.com/image.jpg'
+        )
+        # Already processed and too-short pictures are never submitted
+        PictureOfTheDay.objects.create(
+            source=PictureSource.WIKIPEDIA,
+            date=date(2024, 1, 1),
+            title='Processed',
+            original_explanation=self.explanation,
+            image_url='https://example.com/image.jpg',
+            is_processed=True
+        )
+        PictureOfTheDay.objects.create(
+            source=PictureSource.APOD,
+            date=date(2024, 1, 2),
+            title='Short',
+            original_explanation='Short caption',
+            image_url='https://example.com/image.jpg'
+        )
+
+    def custom_id(self, picture):
+        """The custom_id a picture is submitted under"""
+        return f'{picture.pk}:{explanation_hash(self.explanation)}'
+
+    @patch('pictures.management.commands.process_pictures.TextProcessor')
+    def test_submit_and_collect(self, mock_text_processor):
+        """Test that unprocessed pictures are claimed, submitted and results saved"""
+        processor = mock_text_processor.return_value
+        processor.cached_description.return_value = None
+        processor.submit_description_batch.return_value = 'batch_123'
+
+        def fetch_description_batch(batch_id, wait):
+            # The pictures are claimed while the batch runs
+            metadata = processor.submit_description_batch.call_args.kwargs['metadata']
+            claimed = PictureOfTheDay.objects.filter(processing_started_at__isnull=False)
+            self.assertEqual(set(claimed.values_list('pk', flat=True)), {self.picture.pk, self.failing.pk})
+            results = {
+                self.custom_id(self.picture): ('Processed summary', None),
+                self.custom_id(self.failing): (None, 'rate limited'),
+            }
+            return results, metadata
+
+        processor.fetch_description_batch.side_effect = fetch_description_batch
+
+        out = StringIO()
+        call_command('process_pictures', stdout=out)
+
+        items = processor.submit_description_batch.call_args[0][0]
+        self.assertEqual(
+            sorted(items),
+            sorted([
+                (self.custom_id(self.picture), self.explanation, 'astronomy'),
+                (self.custom_id(self.failing), self.explanation, 'general'),
+            ])
+        )
+        processor.fetch_description_batch.assert_called_once_with('batch_123', wait=True)
+
+        self.picture.refresh_from_db()
+        self.assertTrue(self.picture.is_processed)
+        self.assertEqual(self.picture.processed_explanation, 'Processed summary')
+        self.assertEqual(self.picture.explanation_hash, explanation_hash(self.explanation))
+        self.assertIsNone(self.picture.processing_started_at)
+        processor.cache_description.assert_called_once_with(self.explanation, 'astronomy', 'Processed summary')
+        self.failing.refresh_from_db()
+        self.assertFalse(self.failing.is_processed)
+        self.assertEqual(self.failing.processing_error, 'rate limited')
+        self.assertIsNone(self.failing.processing_started_at)
+        self.assertIn('Processed 1 pictures, 1 failed', out.getvalue())
+
+    @patch('pictures.management.commands.process_pictures.TextProcessor')
+    def test_cached_descriptions_not_submitted(self, mock_text_processor):
+        """Test that descriptions already in the llm cache are stored without a batch request"""
+        processor = mock_text_processor.return_value
+        processor.cached_description.side_effect = (
+            lambda text, context: 'Cached summary' if context == 'astronomy' else None
+        )
+        processor.submit_description_batch.return_value = 'batch_123'
+
+        call_command('process_pictures', no_wait=True, stdout=StringIO())
+
+        self.picture.refresh_from_db()
+        self.assertTrue(self.picture.is_processed)
+        self.assertEqual(self.picture.processed_explanation, 'Cached summary')
+        items = processor.submit_description_batch.call_args[0][0]
+        self.assertEqual([item[0] for item in items], [self.custom_id(self.failing)])
+
+    @patch('pictures.management.commands.process_pictures.TextProcessor')
+    def test_claimed_pictures_not_submitted(self, mock_text_processor):
+        """Test that pictures claimed by another run are left out of the batch"""
+        processor = mock_text_processor.return_value
+        processor.cached_description.return_value = None
+        processor.submit_description_batch.return_value = 'batch_123'
+        claimed_at = timezone.now()
+        PictureOfTheDay.objects.filter(pk=self.failing.pk).update(processing_started_at=claimed_at)
+
+        call_command('process_pictures', no_wait=True, stdout=StringIO())
+
+        items = processor.submit_description_batch.call_args[0][0]
+        self.assertEqual([item[0] for item in items], [self.custom_id(self.picture)])
+        self.failing.refresh_from_db()
+        self.assertEqual(self.failing.processing_started_at, claimed_at)
+
+    @patch('pictures.management.commands.process_pictures.TextProcessor')
+    def test_result_for_edited_explanation_dropped(self, mock_text_processor):
+        """Test that a result made from text edited since submission isn't stored"""
+        processor = mock_text_processor.return_value
+        claimed_at = timezone.now()
+        PictureOfTheDay.objects.filter(pk=self.picture.pk).update(
+            original_explanation='An edited explanation, different from the one submitted in the batch',
+            processing_started_at=claimed_at,
+        )
+        processor.fetch_description_batch.return_value = (
+            {self.custom_id(self.picture): ('Summary of the old text', None)},
+            {'claimed_at': claimed_at.isoformat()},
+        )
+
+        out = StringIO()
+        call_command('process_pictures', batch_id='batch_123', stdout=out)
+
+        self.picture.refresh_from_db()
+        self.assertFalse(self.picture.is_processed)
+        self.assertIsNone(self.picture.processed_explanation)
+        self.assertIsNone(self.picture.processing_started_at)
+        processor.cache_description.assert_not_called()
+        self.assertIn('1 skipped because their explanation changed', out.getvalue())
+
+    @patch('pictures.management.commands.process_pictures.TextProcessor')
+    def test_no_wait_returns_batch_id(self, mock_text_processor):
+        """Test that --no-wait submits without collecting"""
+        processor = mock_text_processor.return_value
+        processor.cached_description.return_value = None
+        processor.submit_description_batch.return_value = 'batch_123'
+
+        out = StringIO()
+        call_command('process_pictures', no_wait=True, stdout=out)
+
+        self.assertIn('--batch-id batch_123', out.getvalue())
+        processor.fetch_description_batch.assert_not_called()
+
+    @patch('pictures.management.commands.process_pictures.TextProcessor')
+    def test_collect_running_batch(self, mock_text_processor):
+        """Test that collecting an unfinished batch without waiting changes nothing"""
+        processor = mock_text_processor.return_value
+        processor.fetch_description_batch.return_value = None
+
+        out = StringIO()
+        call_command('process_pictures', batch_id='batch_123', no_wait=True, stdout=out)
+
+        processor.submit_description_batch.assert_not_called()
+        self.assertIn('still running', out.getvalue())
+        self.assertFalse(PictureOfTheDay.objects.filter(pk=self.picture.pk, is_processed=True).exists())
@@ -0,0 +1,151 @@
+"""
+Unit tests for image and text processors
+"""
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase, TestCase
+from unittest.mock import patch, MagicMock
+from io import BytesIO
+from PIL import Image
+from pictures.processors import ImageProcessor, TextProcessor, METADATA_CACHE_TIMEOUT
+
+
+def make_image_response(width=40, height=30, headers=None):
+    """Build a mock streaming response serving a small PNG"""
+    buffer = BytesIO()
+    Image.new('RGB', (width, height)).save(buffer, 'PNG')
+    data = buffer.getvalue()
+
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = 200
+    response.headers = {'Content-Length': str(len(data)), **(headers or {})}
+    response.iter_content.side_effect = lambda chunk_size: iter([data])
+    return response, len(data)
+
+
+class ImageMetadataCacheTest(SimpleTestCase):
+    """Test cases for caching ImageProcessor.get_image_metadata results"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.url = 'https://example.com/image.png'
+
+    @patch('pictures.processors._SESSION.get')
+    def test_metadata_cached_by_url(self, mock_get):
+        """Test that a second lookup of the same URL doesn't download again"""
+        mock_get.return_value, size = make_image_response(headers={'Cache-Control': 'max-age=600'})
+
+        with patch('pictures.processors.cache.set', wraps=cache.set) as mock_set:
+            self.assertEqual(ImageProcessor.get_image_metadata(self.url), (40, 30, size))
+            self.assertEqual(mock_set.call_args[1]['timeout'], 600)
+        self.assertEqual(ImageProcessor.get_image_metadata(self.url), (40, 30, size))
+
+        mock_get.assert_called_once()
+
+    @patch('pictures.processors._SESSION.get')
+    def test_failed_lookup_not_cached(self, mock_get):
+        """Test that errors are retried on the next lookup"""
+        mock_get.side_effect = Exception('Network error')
+        self.assertEqual(ImageProcessor.get_image_metadata(self.url), (None, None, None))
+
+        mock_get.side_effect = None
+        mock_get.return_value, size = make_image_response()
+        self.assertEqual(ImageProcessor.get_image_metadata(self.url), (40, 30, size))
+
+    def test_cache_timeout_from_headers(self):
+        """Test that the cache lifetime follows max-age and ignores past Expires dates"""
+        self.assertEqual(ImageProcessor._cache_timeout({'Cache-Control': 'public, max-age=3600'}), 3600)
+        self.assertEqual(
+            ImageProcessor._cache_timeout({'Expires': 'Thu, 01 Jan 1970 00:00:00 GMT'}),
+            METADATA_CACHE_TIMEOUT
+        )
+        self.assertEqual(ImageProcessor._cache_timeout({}), METADATA_CACHE_TIMEOUT)
+
+    def test_no_cache_directives(self):
+        """Test that responses marked not to be cached are looked up again"""
+        for cache_control in ('max-age=0', 'no-store', 'no-cache, max-age=3600', 'private, No-Cache'):
+            self.assertEqual(ImageProcessor._cache_timeout({'Cache-Control': cache_control}), 0)
+
+        with patch('pictures.processors._SESSION.get') as mock_get:
+            mock_get.side_effect = lambda *args, **kwargs: make_image_response(
+                headers={'Cache-Control': 'no-store'}
+            )[0]
+            ImageProcessor.get_image_metadata(self.url)
+            ImageProcessor.get_image_metadata(self.url)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class PeekDimensionsTest(SimpleTestCase):
+    """Test cases for reading dimensions from image headers"""
+
+    def encode(self, fmt, size=(64, 48), **kwargs):
+        """Encode a blank image of the given size"""
+        buffer = BytesIO()
+        Image.new('RGB', size).save(buffer, fmt, **kwargs)
+        return buffer.getvalue()
+
+    def test_known_formats(self):
+        """Test that PNG, GIF, WebP and JPEG headers are parsed"""
+        for fmt, kwargs in [
+            ('PNG', {}),
+            ('GIF', {}),
+            ('WEBP', {}),
+            ('WEBP', {'lossless': True}),
+            ('JPEG', {}),
+            ('JPEG', {'progressive': True, 'icc_profile': b'\x00' * 5000}),
+        ]:
+            with self.subTest(fmt=fmt, **kwargs):
+                self.assertEqual(ImageProcessor._peek_dimensions(self.encode(fmt, **kwargs)), (64, 48))
+
+    def test_incomplete_or_unknown_header(self):
+        """Test that truncated headers and unknown formats return None"""
+        jpeg = self.encode('JPEG', icc_profile=b'\x00' * 5000)
+        self.assertIsNone(ImageProcessor._peek_dimensions(jpeg[:1000]))
+        self.assertIsNone(ImageProcessor._peek_dimensions(self.encode('PNG')[:20]))
+        self.assertIsNone(ImageProcessor._peek_dimensions(b'not an image'))
+
+    def test_read_dimensions_falls_back_to_pil(self):
+        """Test that formats without a header parser are still read"""
+        self.assertEqual(ImageProcessor._read_dimensions(self.encode('BMP')), (64, 48))
+
+
+class DescriptionCacheTest(TestCase):
+    """Test cases for caching TextProcessor.process_picture_description results"""
+
+    def setUp(self):
+        """Set up test data"""
+        caches['llm'].clear()
+        self.processor = TextProcessor(api_key='test_key')
+        self.processor.client = MagicMock()
+        completion = self.processor.client.chat.completions.create.return_value
+        completion.choices[0].message.content = 'A summary of the picture'
+
+    def test_same_text_processed_once(self):
+        """Test that repeated descriptions reuse the cached result"""
+        for _ in range(2):
+            result = self.processor.process_picture_description('Original text', 'astronomy')
+            self.assertEqual(result, 'A summary of the picture')
+
+        self.processor.client.chat.completions.create.assert_called_once()
+
+    def test_context_is_part_of_key(self):
+        """Test that the same text in another context is processed again"""
+        self.processor.process_picture_description('Original text', 'astronomy')
+        self.processor.process_picture_description('Original text', 'general')
+
+        self.assertEqual(self.processor.client.chat.completions.create.call_count, 2)
+
+    def test_result_kept_in_llm_cache(self):
+        """Test that results go to the persistent 'llm' cache, not the default one"""
+        self.processor.process_picture_description('Original text', 'astronomy')
+
+        # A later run builds a new processor and client
+        processor = TextProcessor(api_key='test_key')
+        processor.client = MagicMock()
+        cache.clear()
+        result = processor.process_picture_description('Original text', 'astronomy')
+
+        self.assertEqual(result, 'A summary of the picture')
+        processor.client.chat.completions.create.assert_not_called()
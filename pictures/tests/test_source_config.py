@@ -6,27 +6,34 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from datetime import date
-from pictures.models import PictureOfTheDay, PictureSource, SourceConfiguration
+from pictures.models import PictureOfTheDay, PictureSource, SourceConfiguration, disabled_sources, enabled_sources
 
 
 class SourceConfigurationModelTest(TestCase):
     """Test cases for SourceConfiguration model"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.apod_config = SourceConfiguration.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once; each test's changes are rolled back"""
+        cls.apod_config = SourceConfiguration.objects.create(
             source=PictureSource.APOD,
             is_enabled=True
         )
-        self.wiki_config = SourceConfiguration.objects.create(
+        cls.wiki_config = SourceConfiguration.objects.create(
             source=PictureSource.WIKIPEDIA,
             is_enabled=True
         )
-        self.bing_config = SourceConfiguration.objects.create(
+        cls.bing_config = SourceConfiguration.objects.create(
             source=PictureSource.BING,
             is_enabled=False  # Disabled
         )
     
+    def setUp(self):
+        """Drop source states cached by earlier tests"""
+        # Rollbacks skip the post_save invalidation, so a test that changed
+        # a configuration may have left its states in the cache
+        SourceConfiguration.clear_cache()
+    
     def test_source_configuration_str(self):
         """Test string representation"""
         self.assertIn('Enabled', str(self.apod_config))
@@ -47,6 +54,11 @@ class SourceConfigurationModelTest(TestCase):
         self.assertIn('wikipedia', enabled)
         self.assertNotIn('bing', enabled)
     
+    def test_enabled_and_disabled_source_sets(self):
+        """Test enabled_sources/disabled_sources helpers"""
+        self.assertEqual(enabled_sources(), frozenset({'apod', 'wikipedia'}))
+        self.assertEqual(disabled_sources(), frozenset({'bing'}))
+    
     def test_is_source_enabled(self):
         """Test is_source_enabled class method"""
         self.assertTrue(SourceConfiguration.is_source_enabled('apod'))
@@ -55,31 +67,46 @@ class SourceConfigurationModelTest(TestCase):
         
         # Test non-existent source (should default to enabled for backward compatibility)
         self.assertTrue(SourceConfiguration.is_source_enabled('nonexistent'))
+    
+    def test_source_states_cached_until_changed(self):
+        """Test enabled checks are served from cache and invalidated on writes"""
+        SourceConfiguration.is_source_enabled('apod')
+        with self.assertNumQueries(0):
+            self.assertFalse(SourceConfiguration.is_source_enabled('bing'))
+            self.assertNotIn('bing', SourceConfiguration.get_enabled_sources())
+        
+        # Saving a single configuration invalidates via post_save
+        self.bing_config.is_enabled = True
+        self.bing_config.save()
+        self.assertTrue(SourceConfiguration.is_source_enabled('bing'))
+        
+        # Queryset updates bypass signals but still invalidate
+        SourceConfiguration.objects.filter(source=PictureSource.APOD).update(is_enabled=False)
+        self.assertFalse(SourceConfiguration.is_source_enabled('apod'))
 
 
 class SourceConfigurationAPITest(TestCase):
     """Test cases for SourceConfiguration in API views"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = APIClient()
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once; each test's changes are rolled back"""
         # Create source configurations
-        self.apod_config = SourceConfiguration.objects.create(
+        cls.apod_config = SourceConfiguration.objects.create(
             source=PictureSource.APOD,
             is_enabled=True
         )
-        self.wiki_config = SourceConfiguration.objects.create(
+        cls.wiki_config = SourceConfiguration.objects.create(
             source=PictureSource.WIKIPEDIA,
             is_enabled=True
         )
-        self.bing_config = SourceConfiguration.objects.create(
+        cls.bing_config = SourceConfiguration.objects.create(
             source=PictureSource.BING,
             is_enabled=False  # Disabled
         )
         
         # Create test pictures
-        self.apod_picture = PictureOfTheDay.objects.create(
+        cls.apod_picture = PictureOfTheDay.objects.create(
             source=PictureSource.APOD,
             date=date.today(),
             title='Today APOD',
@@ -88,7 +115,7 @@ class SourceConfigurationAPITest(TestCase):
             media_type='image'
         )
         
-        self.bing_picture = PictureOfTheDay.objects.create(
+        cls.bing_picture = PictureOfTheDay.objects.create(
             source=PictureSource.BING,
             date=date.today(),
             title='Today Bing',
@@ -97,6 +124,13 @@ class SourceConfigurationAPITest(TestCase):
             media_type='image'
         )
     
+    def setUp(self):
+        """Set up a client and drop source states cached by earlier tests"""
+        self.client = APIClient()
+        # Rollbacks skip the post_save invalidation, so a test that changed
+        # a configuration may have left its states in the cache
+        SourceConfiguration.clear_cache()
+    
     def test_sources_endpoint_returns_only_enabled(self):
         """Test that sources endpoint returns only enabled sources"""
         url = reverse('pictures-sources')
@@ -158,6 +192,23 @@ class SourceConfigurationAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('disabled', response.json()['error'].lower())
     
+    def test_source_checks_cached_across_requests(self):
+        """Test that only the first request reads the source configurations"""
+        url = reverse('pictures-list-by-source', kwargs={'source': 'apod'})
+        self.client.get(url)
+        
+        # Only the pictures are queried once the source states are cached
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        # Enabling a source invalidates the cache for the next request
+        self.bing_config.is_enabled = True
+        self.bing_config.save()
+        url = reverse('pictures-list-by-source', kwargs={'source': 'bing'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
     def test_sources_endpoint_backward_compatibility(self):
         """Test that sources endpoint works when no configurations exist"""
         # Delete all configurations
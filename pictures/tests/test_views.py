@@ -6,17 +6,19 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from datetime import date, timedelta
 from pictures.models import PictureOfTheDay, PictureSource, SourceConfiguration
+from pictures.renderers import ORJSONRenderer
+from pictures.serializers import PictureOfTheDayDetailSerializer
 
 
 class PictureOfTheDayViewSetTest(TestCase):
     """Test cases for PictureOfTheDayViewSet"""
     
-    def setUp(self):
-        """Set up test data"""
-        self.client = APIClient()
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once; each test's changes are rolled back"""
         # Create source configurations (all enabled by default for tests)
         SourceConfiguration.objects.get_or_create(
             source=PictureSource.APOD,
@@ -32,7 +34,7 @@ class PictureOfTheDayViewSetTest(TestCase):
         )
         
         # Create test pictures
-        self.apod_picture = PictureOfTheDay.objects.create(
+        cls.apod_picture = PictureOfTheDay.objects.create(
             source=PictureSource.APOD,
             date=date.today(),
             title='Today APOD',
@@ -41,7 +43,7 @@ class PictureOfTheDayViewSetTest(TestCase):
             media_type='image'
         )
         
-        self.wiki_picture = PictureOfTheDay.objects.create(
+        cls.wiki_picture = PictureOfTheDay.objects.create(
             source=PictureSource.WIKIPEDIA,
             date=date.today(),
             title='Today Wikipedia',
@@ -50,7 +52,7 @@ class PictureOfTheDayViewSetTest(TestCase):
             media_type='image'
         )
         
-        self.bing_picture = PictureOfTheDay.objects.create(
+        cls.bing_picture = PictureOfTheDay.objects.create(
             source=PictureSource.BING,
             date=date.today() - timedelta(days=1),
             title='Yesterday Bing',
@@ -59,10 +61,19 @@ class PictureOfTheDayViewSetTest(TestCase):
             media_type='image'
         )
     
+    def setUp(self):
+        """Set up a client and drop source states cached by earlier tests"""
+        self.client = APIClient()
+        # Rollbacks skip the post_save invalidation, so a test that changed
+        # a configuration may have left its states in the cache
+        SourceConfiguration.clear_cache()
+    
     def test_list_pictures(self):
         """Test listing all pictures"""
         url = reverse('pictures-list')
-        response = self.client.get(url)
+        # COUNT for the paginator and one SELECT for the page
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 3)
@@ -205,7 +216,9 @@ class PictureOfTheDayViewSetTest(TestCase):
     def test_sources_endpoint(self):
         """Test sources endpoint"""
         url = '/api/pictures/sources/'
-        response = self.client.get(url)
+        # One SELECT of the source configurations
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
@@ -223,7 +236,9 @@ class PictureOfTheDayViewSetTest(TestCase):
     def test_list_by_source_endpoint(self):
         """Test list_by_source endpoint"""
         url = '/api/pictures/list/apod/'
-        response = self.client.get(url)
+        # Source states (the cache is cold) and one SELECT for the pictures
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
@@ -244,12 +259,31 @@ class PictureOfTheDayViewSetTest(TestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-    
+
+    def test_export_endpoint(self):
+        """Test export endpoint returns metadata rows for a source"""
+        url = '/api/pictures/export/?source=apod'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.json()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['source'], 'apod')
+        self.assertIn('image_size_mb', rows[0])
+        self.assertIn('image_resolution', rows[0])
+        self.assertNotIn('original_explanation', rows[0])
+
+    def test_export_endpoint_invalid_source(self):
+        """Test export endpoint with invalid source"""
+        response = self.client.get('/api/pictures/export/?source=invalid')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_pagination(self):
         """Test that list view is paginated"""
         # Create more pictures to test pagination
-        for i in range(25):
-            PictureOfTheDay.objects.create(
+        PictureOfTheDay.objects.bulk_create([
+            PictureOfTheDay(
                 source=PictureSource.APOD,
                 date=date.today() - timedelta(days=i+10),
                 title=f'Picture {i}',
@@ -257,9 +291,13 @@ class PictureOfTheDayViewSetTest(TestCase):
                 image_url=f'https://example.com/image{i}.jpg',
                 media_type='image'
             )
+            for i in range(25)
+        ])
         
         url = reverse('pictures-list')
-        response = self.client.get(url)
+        # Still a COUNT and one page SELECT, however many pictures exist
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('results', response.data)
@@ -304,8 +342,8 @@ class PictureOfTheDayViewSetTest(TestCase):
     def test_all_recent_endpoint_with_multiple_bing_pictures(self):
         """Test all_recent endpoint includes multiple recent Bing pictures"""
         # Create multiple Bing pictures
-        for i in range(7):
-            PictureOfTheDay.objects.create(
+        PictureOfTheDay.objects.bulk_create([
+            PictureOfTheDay(
                 source=PictureSource.BING,
                 date=date.today() - timedelta(days=i+2),
                 title=f'Bing Picture {i}',
@@ -313,6 +351,8 @@ class PictureOfTheDayViewSetTest(TestCase):
                 image_url=f'https://example.com/bing{i}.jpg',
                 media_type='image'
             )
+            for i in range(7)
+        ])
         
         url = '/api/pictures/all_recent/'
         response = self.client.get(url)
@@ -384,8 +424,8 @@ class PictureOfTheDayViewSetTest(TestCase):
     def test_all_recent_endpoint_picture_distribution(self):
         """Test that all_recent balances pictures across sources"""
         # Create 7 more Bing pictures (total 8 with existing one)
-        for i in range(7):
-            PictureOfTheDay.objects.create(
+        PictureOfTheDay.objects.bulk_create([
+            PictureOfTheDay(
                 source=PictureSource.BING,
                 date=date.today() - timedelta(days=i+2),
                 title=f'Bing {i}',
@@ -393,6 +433,8 @@ class PictureOfTheDayViewSetTest(TestCase):
                 image_url=f'https://example.com/bing{i}.jpg',
                 media_type='image'
             )
+            for i in range(7)
+        ])
         
         url = '/api/pictures/all_recent/'
         response = self.client.get(url)
@@ -414,3 +456,23 @@ class PictureOfTheDayViewSetTest(TestCase):
         # Total should be around 10 pictures (1 APOD + 1 Wikipedia + 8 Bing)
         self.assertGreaterEqual(len(response.data), 8)
 
+
+class ORJSONRendererTest(TestCase):
+    """Test cases for ORJSONRenderer"""
+
+    def test_matches_json_renderer(self):
+        """Test that orjson output matches DRF's JSONRenderer byte for byte"""
+        picture = PictureOfTheDay.objects.create(
+            source=PictureSource.APOD,
+            date=date(2024, 1, 15),
+            title='Caf\u00e9 Nebula',
+            original_explanation='Test explanation',
+            image_url='https://example.com/image.jpg',
+            image_size_bytes=2097152
+        )
+        data = PictureOfTheDayDetailSerializer(picture).data
+        data['generated_at'] = timezone.now()
+
+        rendered = ORJSONRenderer().render(data)
+
+        self.assertEqual(rendered, JSONRenderer().render(data))
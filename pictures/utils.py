@@ -1,6 +1,7 @@
 """
 Utility functions for the pictures app
 """
+import hashlib
 import html
 
 
@@ -32,3 +33,13 @@ def sanitize_html_entities(text):
     
     return sanitized
 
+
+def explanation_hash(text):
+    """
+    Short content hash of an explanation, stored alongside its processed
+    version to tell whether the text changed since it was processed.
+    
+    Returns:
+        16-character hex digest (8-byte BLAKE2b)
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
@@ -1,6 +1,7 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import F
 from django.utils import timezone
 from django.shortcuts import render
 from datetime import date, timedelta
@@ -8,6 +9,26 @@ from .models import PictureOfTheDay, PictureSource, SourceConfiguration
 from .serializers import PictureOfTheDaySerializer, PictureOfTheDayDetailSerializer
 
 
+# Columns PictureOfTheDaySerializer reads, directly or through the model's
+# display properties. List responses load only these so unused columns
+# (thumbnail_url, processing_error, ...) stay in the database.
+LIST_COLUMNS = (
+    'id', 'source', 'date', 'title', 'media_type', 'copyright', 'source_url',
+    'original_explanation', 'simplified_explanation', 'processed_explanation',
+    'image_url', 'hd_image_url', 'local_image_path',
+    'image_width', 'image_height', 'image_size_mb_cached', 'image_resolution_cached',
+    'is_processed', 'created_at',
+)
+
+
+# Columns returned by the export action, read with values() so rows skip
+# model instantiation and the serializer entirely
+EXPORT_COLUMNS = (
+    'id', 'source', 'date', 'title', 'media_type', 'copyright', 'source_url',
+    'is_processed', 'image_width', 'image_height', 'created_at',
+)
+
+
 class PictureOfTheDayViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for Picture of the Day data from various sources
@@ -16,6 +37,7 @@ class PictureOfTheDayViewSet(viewsets.ReadOnlyModelViewSet):
     retrieve: Get specific picture by ID
     today: Get today's picture (optionally filtered by source)
     by_date: Get picture for specific date (optionally filtered by source)
+    export: Get picture metadata in bulk, unpaginated (optionally filtered by source)
     """
     
     queryset = PictureOfTheDay.objects.all()
@@ -50,6 +72,8 @@ class PictureOfTheDayViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Filter by source if provided in query params (for list view)"""
         queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.only(*LIST_COLUMNS)
         source = self.request.query_params.get('source', None)
         if source:
             queryset = queryset.filter(source=source)
@@ -213,13 +237,13 @@ class PictureOfTheDayViewSet(viewsets.ReadOnlyModelViewSet):
                 continue  # Handle Bing separately to get multiple pictures
             
             try:
-                picture = PictureOfTheDay.objects.get(source=source, date=today)
+                picture = PictureOfTheDay.objects.only(*LIST_COLUMNS).get(source=source, date=today)
                 pictures.append(picture)
             except PictureOfTheDay.DoesNotExist:
                 # Try yesterday if today's not available
                 yesterday = today - timedelta(days=1)
                 try:
-                    picture = PictureOfTheDay.objects.get(source=source, date=yesterday)
+                    picture = PictureOfTheDay.objects.only(*LIST_COLUMNS).get(source=source, date=yesterday)
                     pictures.append(picture)
                 except PictureOfTheDay.DoesNotExist:
                     pass
@@ -228,7 +252,7 @@ class PictureOfTheDayViewSet(viewsets.ReadOnlyModelViewSet):
         if 'bing' in enabled_sources:
             recent_bing = PictureOfTheDay.objects.filter(
                 source='bing'
-            ).order_by('-date')[:8]  # Get 8 recent Bing pictures
+            ).only(*LIST_COLUMNS).order_by('-date')[:8]  # Get 8 recent Bing pictures
             
             pictures.extend(recent_bing)
         
@@ -252,10 +276,33 @@ class PictureOfTheDayViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        pictures = PictureOfTheDay.objects.filter(source=source).order_by('-date')
+        pictures = PictureOfTheDay.objects.filter(source=source).only(*LIST_COLUMNS).order_by('-date')
         serializer = PictureOfTheDaySerializer(pictures, many=True)
         return Response(serializer.data)
 
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Get metadata (no explanations) for all pictures, newest first, for bulk consumers"""
+        pictures = PictureOfTheDay.objects.all()
+        
+        source = request.query_params.get('source', None)
+        if source:
+            is_valid, error_message = self._validate_source(source)
+            if not is_valid:
+                return Response(
+                    {'error': error_message},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            pictures = pictures.filter(source=source)
+        
+        rows = pictures.order_by('-date', 'source').values(
+            *EXPORT_COLUMNS,
+            image_size_mb=F('image_size_mb_cached'),
+            image_resolution=F('image_resolution_cached'),
+        )
+        return Response(list(rows))
+
 
 def picture_of_the_day_view(request):
     """Render the Picture of the Day page"""